@@ -3,27 +3,25 @@
 Nueva Vista Wrapped - AI Engagement Score
 Analyze the quality and depth of your AI collaborations
 
-Usage: python nv_engagement_score.py /path/to/conversations.json
+Usage: python nv_engagement_score.py /path/to/conversations.json [more exports to merge ...]
 """
 
 import argparse
 import json
-import re
 import sys
+from bisect import bisect_left
 from collections import Counter, defaultdict
-from datetime import datetime
-
-def tokenize(text):
-    """Basic word tokenizer"""
-    if not text:
-        return []
-
-    # Strip code blocks and URLs
-    text = re.sub(r"`.*?`", " ", text, flags=re.S)
-    text = re.sub(r"https?://\S+", " ", text)
-
-    tokens = re.findall(r"[A-Za-z0-9'']+", text.lower())
-    return tokens
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+# Shared utilities live in scripts/ next to helpers.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from helpers import PATTERN_NAMES, analyze_message_patterns, to_epoch
+from chunked_reader import quarantine_report
+from merge import MergedExports, open_exports
+from streaming import NDJSONWriter, ProgressReporter
+from tokenizer import tokenize
 
 def extract_message_text(msg):
     """Extract text from ChatGPT message format"""
@@ -44,98 +42,97 @@ def extract_message_text(msg):
 
     return content.get("text", "")
 
-def analyze_message_patterns(text):
-    """Analyze patterns in user messages"""
-    if not text:
-        return {}
+def summarize_conversation(conv, unicode=False, on_message=None):
+    """Summarize one conversation into the per-conversation inputs of the engagement score
+
+    on_message, if given, is called with (node_id, role, text, timestamp,
+    word_count) for each message as it is tokenized, so callers that also
+    need per-message rows don't tokenize the conversation a second time.
+    The timestamp falls back to the conversation's create_time, as in
+    nv_quick_hours.iter_messages.
+    """
+    user_words = 0
+    ai_words = 0
+    user_msgs = 0
+    ai_msgs = 0
+    vocabulary = set()
+    patterns = dict.fromkeys(PATTERN_NAMES, 0)
+    first_ts = None
+    last_ts = None
+
+    for node_id, node in conv.get("mapping", {}).items():
+        msg = node.get("message")
+        if not msg:
+            continue
 
-    text_lower = text.lower()
+        author = msg.get("author", {})
+        role = author.get("role", "")
+        text = extract_message_text(msg)
+        tokens = tokenize(text, unicode=unicode)
+        if on_message is not None:
+            on_message(node_id, role, text, msg.get("create_time") or conv.get("create_time"), len(tokens))
 
-    patterns = {
-        "questions": len(re.findall(r"\?", text)),
-        "code_requests": len(re.findall(r"\b(code|function|script|program)\b", text_lower)),
-        "creative_requests": len(re.findall(r"\b(create|write|generate|design|make)\b", text_lower)),
-        "analysis_requests": len(re.findall(r"\b(analyze|explain|compare|evaluate)\b", text_lower)),
-        "learning_requests": len(re.findall(r"\b(learn|teach|understand|how)\b", text_lower)),
-    }
+        timestamp = to_epoch(msg.get("create_time"))
+        if timestamp is not None:
+            if first_ts is None or timestamp < first_ts:
+                first_ts = timestamp
+            if last_ts is None or timestamp > last_ts:
+                last_ts = timestamp
 
-    return patterns
+        if role == "user":
+            user_words += len(tokens)
+            user_msgs += 1
+            vocabulary.update(tokens)
 
-def calculate_engagement_score(conversations_data):
-    """Calculate AI engagement score based on multiple factors"""
+            # Analyze message patterns
+            for pattern, count in analyze_message_patterns(text).items():
+                patterns[pattern] += count
 
-    total_conversations = 0
-    total_user_words = 0
-    total_ai_words = 0
-    total_user_msgs = 0
-    total_ai_msgs = 0
+        elif role == "assistant":
+            ai_words += len(tokens)
+            ai_msgs += 1
 
-    conversation_lengths = []
-    vocabulary_diversity = []
-    interaction_patterns = defaultdict(int)
+    if first_ts is None:
+        first_ts = last_ts = to_epoch(conv.get("create_time"))
 
-    conversations = conversations_data if isinstance(conversations_data, list) else [conversations_data]
+    return {
+        "id": conv.get("id"),
+        "title": conv.get("title"),
+        "user_msgs": user_msgs,
+        "ai_msgs": ai_msgs,
+        "user_words": user_words,
+        "ai_words": ai_words,
+        "vocab_size": len(vocabulary),
+        "patterns": patterns,
+        "first_timestamp": first_ts,
+        "last_timestamp": last_ts,
+        "time_span_seconds": last_ts - first_ts if first_ts is not None else None
+    }
 
-    for conv in conversations:
-        if not isinstance(conv, dict):
-            continue
+def calculate_component_scores(total_conversations, total_user_msgs, total_ai_msgs, total_interactions,
+                               depth_conversations, depth_messages, depth_vocabulary):
+    """Calculate the five engagement components from aggregate counts
 
-        total_conversations += 1
-        conv_user_words = 0
-        conv_ai_words = 0
-        conv_user_msgs = 0
-        conv_ai_msgs = 0
-        conv_vocabulary = set()
-
-        mapping = conv.get("mapping", {})
-
-        for node in mapping.values():
-            msg = node.get("message")
-            if not msg:
-                continue
-
-            author = msg.get("author", {})
-            role = author.get("role", "")
-            text = extract_message_text(msg)
-            tokens = tokenize(text)
-
-            if role == "user":
-                conv_user_words += len(tokens)
-                conv_user_msgs += 1
-                total_user_words += len(tokens)
-                total_user_msgs += 1
-                conv_vocabulary.update(tokens)
-
-                # Analyze message patterns
-                patterns = analyze_message_patterns(text)
-                for pattern, count in patterns.items():
-                    interaction_patterns[pattern] += count
-
-            elif role == "assistant":
-                conv_ai_words += len(tokens)
-                conv_ai_msgs += 1
-                total_ai_words += len(tokens)
-                total_ai_msgs += 1
-
-        if conv_user_msgs > 0 and conv_ai_msgs > 0:
-            conversation_lengths.append(conv_user_msgs + conv_ai_msgs)
-            vocabulary_diversity.append(len(conv_vocabulary))
+    depth_* are summed over conversations with both user and AI messages.
+    Every input is a plain sum, so any subset of conversations can be scored
+    from its totals.
 
-    # Calculate scoring components
+    Returns:
+        Tuple of (component scores dict, avg conversation length, avg vocabulary)
+    """
     scores = {}
 
     # 1. Conversation Depth (25 points)
-    avg_conv_length = sum(conversation_lengths) / max(1, len(conversation_lengths))
+    avg_conv_length = depth_messages / max(1, depth_conversations)
     depth_score = min(25, (avg_conv_length / 20) * 25)  # 20 messages = full points
     scores["conversation_depth"] = depth_score
 
     # 2. Vocabulary Diversity (20 points)
-    avg_vocabulary = sum(vocabulary_diversity) / max(1, len(vocabulary_diversity))
+    avg_vocabulary = depth_vocabulary / max(1, depth_conversations)
     vocab_score = min(20, (avg_vocabulary / 100) * 20)  # 100 unique words = full points
     scores["vocabulary_diversity"] = vocab_score
 
     # 3. Interaction Quality (25 points)
-    total_interactions = sum(interaction_patterns.values())
     if total_interactions > 0:
         quality_ratio = total_interactions / max(1, total_user_msgs)
         quality_score = min(25, quality_ratio * 25)
@@ -159,9 +156,144 @@ def calculate_engagement_score(conversations_data):
         utilization_score = 0
     scores["response_utilization"] = utilization_score
 
+    return scores, avg_conv_length, avg_vocabulary
+
+def component_inputs(summary):
+    """The additive calculate_component_scores inputs contributed by one conversation summary"""
+    has_depth = summary["user_msgs"] > 0 and summary["ai_msgs"] > 0
+    return (
+        1,
+        summary["user_msgs"],
+        summary["ai_msgs"],
+        sum(summary["patterns"].values()),
+        1 if has_depth else 0,
+        summary["user_msgs"] + summary["ai_msgs"] if has_depth else 0,
+        summary["vocab_size"] if has_depth else 0
+    )
+
+TIMELINE_PERIODS = ("month", "week", "30d")
+
+class EngagementTimeline:
+    """Engagement scores for arbitrary time windows
+
+    Conversations are sorted by start time and every component input is kept
+    as a prefix-sum array, so the totals for any window are two bisects and
+    a subtraction away, and a whole series of windows costs O(windows) rather
+    than re-scanning the conversations for each one.
+    """
+
+    def __init__(self, dated_inputs):
+        """dated_inputs: iterable of (timestamp, component_inputs(summary)) pairs"""
+        dated_inputs = sorted(dated_inputs, key=lambda item: item[0])
+        self.timestamps = [timestamp for timestamp, _ in dated_inputs]
+        columns = zip(*(inputs for _, inputs in dated_inputs)) if dated_inputs else [()] * 7
+        self.prefix_sums = [list(accumulate(column, initial=0)) for column in columns]
+
+    def window(self, start, end):
+        """Score the conversations that started in [start, end) (epoch seconds)"""
+        i = bisect_left(self.timestamps, start)
+        j = bisect_left(self.timestamps, end)
+        totals = [prefix[j] - prefix[i] for prefix in self.prefix_sums]
+        scores, _, _ = calculate_component_scores(*totals)
+        return {
+            "total_score": sum(scores.values()),
+            "component_scores": scores,
+            "conversations": totals[0]
+        }
+
+    def series(self, period="month"):
+        """Engagement per calendar month, per ISO week, or trailing 30 days (evaluated daily)
+
+        Returns:
+            List of window dicts with "period", "start" and "end" (UTC ISO dates)
+        """
+        if not self.timestamps:
+            return []
+
+        first = datetime.fromtimestamp(self.timestamps[0], tz=timezone.utc)
+        last = datetime.fromtimestamp(self.timestamps[-1], tz=timezone.utc)
+        start = first.replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == "month":
+            start = start.replace(day=1)
+        elif period == "week":
+            start -= timedelta(days=start.weekday())
+
+        series = []
+        while start <= last:
+            if period == "month":
+                end = (start + timedelta(days=32)).replace(day=1)
+                label, window_start = start.strftime("%Y-%m"), start
+            elif period == "week":
+                end = start + timedelta(days=7)
+                label, window_start = start.strftime("%G-W%V"), start
+            else:
+                end = start + timedelta(days=1)
+                label, window_start = start.strftime("%Y-%m-%d"), end - timedelta(days=30)
+
+            window = self.window(window_start.timestamp(), end.timestamp())
+            window.update(period=label, start=window_start.date().isoformat(), end=end.date().isoformat())
+            series.append(window)
+            start = end
+
+        return series
+
+def calculate_engagement_score(conversations_data, on_conversation=None, unicode=False, timeline=None):
+    """Calculate AI engagement score based on multiple factors
+
+    conversations_data may be a single conversation, a list, or any iterable
+    of conversations (e.g. a stream).  If given, on_conversation is called
+    with each conversation's summary as soon as it is processed.  unicode
+    selects the Unicode-aware tokenizer for non-ASCII messages.  timeline
+    ("month", "week" or "30d") adds an engagement time series to the result.
+    """
+
+    total_conversations = 0
+    total_user_words = 0
+    total_ai_words = 0
+    total_user_msgs = 0
+    total_ai_msgs = 0
+
+    depth_conversations = 0
+    depth_messages = 0
+    depth_vocabulary = 0
+    interaction_patterns = defaultdict(int)
+    dated_inputs = []
+
+    conversations = [conversations_data] if isinstance(conversations_data, dict) else conversations_data
+
+    for conv in conversations:
+        if not isinstance(conv, dict):
+            continue
+
+        total_conversations += 1
+        summary = summarize_conversation(conv, unicode=unicode)
+        if on_conversation:
+            on_conversation(summary)
+
+        total_user_words += summary["user_words"]
+        total_ai_words += summary["ai_words"]
+        total_user_msgs += summary["user_msgs"]
+        total_ai_msgs += summary["ai_msgs"]
+        for pattern, count in summary["patterns"].items():
+            interaction_patterns[pattern] += count
+
+        if summary["user_msgs"] > 0 and summary["ai_msgs"] > 0:
+            depth_conversations += 1
+            depth_messages += summary["user_msgs"] + summary["ai_msgs"]
+            depth_vocabulary += summary["vocab_size"]
+
+        if timeline and summary["first_timestamp"] is not None:
+            dated_inputs.append((summary["first_timestamp"], component_inputs(summary)))
+
+    # Calculate scoring components
+    scores, avg_conv_length, avg_vocabulary = calculate_component_scores(
+        total_conversations, total_user_msgs, total_ai_msgs, sum(interaction_patterns.values()),
+        depth_conversations, depth_messages, depth_vocabulary
+    )
+
     total_score = sum(scores.values())
 
-    return {
+    result = {
         "total_score": total_score,
         "component_scores": scores,
         "stats": {
@@ -174,6 +306,11 @@ def calculate_engagement_score(conversations_data):
         }
     }
 
+    if timeline:
+        result["timeline"] = EngagementTimeline(dated_inputs).series(timeline)
+
+    return result
+
 def get_engagement_tier(score):
     """Get engagement tier description"""
     if score >= 80:
@@ -193,23 +330,52 @@ def main():
     parser = argparse.ArgumentParser(
         description="Nueva Vista Wrapped - AI Engagement Score Analysis"
     )
-    parser.add_argument("conversations_json", help="Path to conversations.json from ChatGPT export")
+    parser.add_argument("conversations_json", nargs="+",
+                        help="Path to conversations.json from ChatGPT export (several are merged and deduplicated)")
     parser.add_argument("--detailed", "-d", action="store_true", help="Show detailed breakdown")
+    parser.add_argument("--lenient", action="store_true",
+                        help="Skip malformed conversations in truncated or corrupt exports instead of failing")
+    parser.add_argument("--unicode", "-u", action="store_true",
+                        help="Count words in non-Latin scripts (accents, Cyrillic, CJK, ...)")
+    parser.add_argument("--timeline", "-t", choices=TIMELINE_PERIODS,
+                        help="Show engagement over time: per month, per week, or trailing 30 days")
+    parser.add_argument("--emit", choices=["ndjson"],
+                        help="Stream one compact record per conversation as it is processed")
+    parser.add_argument("--output", "-o", default="-",
+                        help="Destination for --emit records (default: stdout)")
 
     args = parser.parse_args()
 
     try:
-        with open(args.conversations_json, "r", encoding="utf-8", errors="ignore") as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ File not found: {args.conversations_json}")
+        stream = open_exports(args.conversations_json, lenient=args.lenient)
+        with ProgressReporter(stream) as progress:
+            conversations = progress.track(stream)
+            if args.emit:
+                with NDJSONWriter(args.output) as writer:
+                    result = calculate_engagement_score(conversations, on_conversation=writer.write,
+                                                        unicode=args.unicode, timeline=args.timeline)
+            else:
+                result = calculate_engagement_score(conversations, unicode=args.unicode,
+                                                    timeline=args.timeline)
+    except FileNotFoundError as e:
+        print(f"❌ File not found: {e.filename}")
         sys.exit(1)
     except json.JSONDecodeError:
-        print(f"❌ Invalid JSON file: {args.conversations_json}")
+        print(f"❌ Invalid JSON file: {', '.join(args.conversations_json)} (try --lenient to recover what's readable)")
         sys.exit(1)
 
-    # Calculate engagement score
-    result = calculate_engagement_score(data)
+    if progress.cancelled:
+        print(f"⚠️  Interrupted: partial results for the first {progress.summary()}", file=sys.stderr)
+    if getattr(stream, "quarantined", None):
+        print(quarantine_report(stream.quarantined), file=sys.stderr)
+    if isinstance(stream, MergedExports):
+        print(f"🔀 Merged {stream.stats['exports']} exports: skipped {stream.stats['duplicate_conversations']:,} "
+              f"duplicate conversations and {stream.stats['duplicate_messages']:,} duplicate messages",
+              file=sys.stderr)
+
+    if args.emit and args.output == "-":
+        # stdout carries the records; keep it machine-readable
+        return
 
     score = result["total_score"]
     tier_emoji, tier_desc = get_engagement_tier(score)
@@ -243,6 +409,13 @@ def main():
         print(f"  • Analysis requests: {stats['interaction_patterns'].get('analysis_requests', 0):,}")
         print()
 
+    if args.timeline:
+        print("📅 ENGAGEMENT OVER TIME:")
+        for window in result["timeline"]:
+            print(f"  • {window['period']}: {window['total_score']:.1f}/100 "
+                  f"({window['conversations']:,} conversations)")
+        print()
+
     print("💡 ENGAGEMENT INSIGHTS:")
 
     stats = result["stats"]
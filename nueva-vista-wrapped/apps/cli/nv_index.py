@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Conversation Index
+Build a local SQLite full-text index of your export once, then answer
+keyword- and date-filtered hours and engagement questions in milliseconds.
+
+Usage:
+    python nv_index.py index /path/to/conversations.json
+    python nv_index.py query --keyword pandas --since 2024-01-01
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from nv_quick_hours import calculate_hours, get_badge_tier
+from nv_engagement_score import (PATTERN_NAMES, calculate_component_scores, get_engagement_tier,
+                                 summarize_conversation)
+
+# Shared utilities live in scripts/ next to helpers.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from helpers import to_epoch
+from chunked_reader import quarantine_report
+from merge import open_exports
+
+DEFAULT_DB = "nv_index.sqlite3"
+INSERT_BATCH_SIZE = 5000
+
+SCHEMA = f"""
+DROP TABLE IF EXISTS conversations;
+DROP TABLE IF EXISTS messages;
+DROP TABLE IF EXISTS messages_fts;
+DROP TABLE IF EXISTS titles_fts;
+
+CREATE TABLE conversations (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT,
+    title TEXT,
+    user_msgs INTEGER,
+    ai_msgs INTEGER,
+    user_words INTEGER,
+    ai_words INTEGER,
+    vocab_size INTEGER,
+    {", ".join(f"{name} INTEGER" for name in PATTERN_NAMES)},
+    first_ts REAL,
+    last_ts REAL
+);
+
+CREATE TABLE messages (
+    rowid INTEGER PRIMARY KEY,
+    conv_rowid INTEGER,
+    node_id TEXT,
+    role TEXT,
+    create_time REAL,
+    word_count INTEGER
+);
+
+-- Contentless: only the search index is stored, not a second copy of the text
+CREATE VIRTUAL TABLE messages_fts USING fts5(text, content='');
+CREATE VIRTUAL TABLE titles_fts USING fts5(title, content='');
+"""
+
+INDEXES = """
+CREATE INDEX messages_conv ON messages (conv_rowid);
+CREATE INDEX messages_time ON messages (create_time);
+CREATE INDEX conversations_time ON conversations (first_ts, last_ts);
+"""
+
+def build_index(conversations, db_path, unicode=False):
+    """Load conversations into a fresh SQLite index
+
+    Rows are inserted in batches inside a single transaction; secondary
+    indexes are created after the bulk load.
+
+    Returns:
+        Tuple of (conversations indexed, messages indexed)
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SCHEMA)
+
+    conv_rows, title_rows, message_rows, text_rows = [], [], [], []
+    conv_count = 0
+    message_count = 0
+
+    def flush():
+        conn.executemany(f"INSERT INTO conversations VALUES ({', '.join('?' * (10 + len(PATTERN_NAMES)))})",
+                         conv_rows)
+        conn.executemany("INSERT INTO titles_fts (rowid, title) VALUES (?, ?)", title_rows)
+        conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)", message_rows)
+        conn.executemany("INSERT INTO messages_fts (rowid, text) VALUES (?, ?)", text_rows)
+        for rows in (conv_rows, title_rows, message_rows, text_rows):
+            rows.clear()
+
+    def add_message(node_id, role, text, timestamp, word_count):
+        nonlocal message_count
+        message_count += 1
+        message_rows.append((message_count, conv_count, node_id, role, to_epoch(timestamp), word_count))
+        text_rows.append((message_count, text))
+
+    with conn:
+        for conv in conversations:
+            if not isinstance(conv, dict):
+                continue
+
+            conv_count += 1
+            # Message rows are collected while the summary tokenizes each message
+            summary = summarize_conversation(conv, unicode=unicode, on_message=add_message)
+            conv_rows.append((
+                conv_count, summary["id"], summary["title"],
+                summary["user_msgs"], summary["ai_msgs"], summary["user_words"], summary["ai_words"],
+                summary["vocab_size"], *(summary["patterns"][name] for name in PATTERN_NAMES),
+                summary["first_timestamp"], summary["last_timestamp"]
+            ))
+            title_rows.append((conv_count, summary["title"] or ""))
+
+            if len(message_rows) >= INSERT_BATCH_SIZE:
+                flush()
+
+        flush()
+        conn.executescript(INDEXES)
+
+    conn.close()
+    return conv_count, message_count
+
+def fts_query(keyword):
+    """Quote each keyword term so user input is never parsed as FTS5 syntax"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in keyword.split())
+
+def query_index(db_path, keyword=None, since=None, until=None):
+    """Answer hours and engagement for conversations matching a keyword and date range
+
+    A conversation matches when its title or any of its messages contains all
+    keyword terms. Hours count every message of a matching conversation that
+    falls within [since, until]; engagement scores the matching conversations
+    active in that range.
+
+    Returns:
+        Dict of matched counts, hours and engagement score
+    """
+    conn = sqlite3.connect(db_path)
+    params = {"since": since, "until": until}
+    message_filters = []
+    conversation_filters = []
+
+    if keyword:
+        params["match"] = fts_query(keyword)
+        matched = """
+            conv_rowid IN (
+                SELECT conv_rowid FROM messages WHERE rowid IN
+                    (SELECT rowid FROM messages_fts WHERE messages_fts MATCH :match)
+                UNION
+                SELECT rowid FROM titles_fts WHERE titles_fts MATCH :match
+            )"""
+        message_filters.append(matched)
+        conversation_filters.append(matched.replace("conv_rowid IN", "rowid IN", 1))
+    if since is not None:
+        message_filters.append("create_time >= :since")
+        conversation_filters.append("last_ts >= :since")
+    if until is not None:
+        message_filters.append("create_time <= :until")
+        conversation_filters.append("first_ts <= :until")
+
+    words = {"user": (0, 0), "assistant": (0, 0)}
+    for role, msgs, total_words in conn.execute(f"""
+            SELECT role, COUNT(*), COALESCE(SUM(word_count), 0) FROM messages
+            WHERE {" AND ".join(message_filters) or "1"}
+            GROUP BY role""", params):
+        words[role] = (msgs, total_words)
+
+    pattern_sum = " + ".join(f"COALESCE(SUM({name}), 0)" for name in PATTERN_NAMES)
+    row = conn.execute(f"""
+        SELECT COUNT(*),
+               COALESCE(SUM(user_msgs), 0),
+               COALESCE(SUM(ai_msgs), 0),
+               {pattern_sum},
+               COALESCE(SUM(user_msgs > 0 AND ai_msgs > 0), 0),
+               COALESCE(SUM(CASE WHEN user_msgs > 0 AND ai_msgs > 0 THEN user_msgs + ai_msgs END), 0),
+               COALESCE(SUM(CASE WHEN user_msgs > 0 AND ai_msgs > 0 THEN vocab_size END), 0)
+        FROM conversations
+        WHERE {" AND ".join(conversation_filters) or "1"}""", params).fetchone()
+    conn.close()
+
+    scores, _, _ = calculate_component_scores(*row)
+
+    return {
+        "conversations": row[0],
+        "user_msgs": words["user"][0],
+        "ai_msgs": words["assistant"][0],
+        "user_words": words["user"][1],
+        "ai_words": words["assistant"][1],
+        "hours": calculate_hours(words["user"][1], words["assistant"][1]),
+        "engagement_score": sum(scores.values()),
+        "component_scores": scores,
+    }
+
+def parse_date_arg(value):
+    """argparse type for --since/--until: ISO date or epoch seconds"""
+    epoch = to_epoch(value)
+    if epoch is None:
+        raise argparse.ArgumentTypeError(f"invalid date: {value}")
+    return epoch
+
+def parse_until_arg(value):
+    """argparse type for --until: like parse_date_arg, but a bare date means the end of that day"""
+    epoch = parse_date_arg(value)
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return epoch
+    # Last representable instant before the next midnight, so the bound stays inclusive
+    return math.nextafter(epoch + 86400, -math.inf)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Nueva Vista Wrapped - Index your conversations for fast queries"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Path to the index database (default: {DEFAULT_DB})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Build the index from a ChatGPT export")
+    index_parser.add_argument("conversations_json", nargs="+",
+                              help="Path to conversations.json from ChatGPT export (several are merged and deduplicated)")
+    index_parser.add_argument("--unicode", "-u", action="store_true",
+                              help="Count words in non-Latin scripts (accents, Cyrillic, CJK, ...)")
+    index_parser.add_argument("--lenient", action="store_true",
+                              help="Skip malformed conversations in truncated or corrupt exports instead of failing")
+
+    query_parser = subparsers.add_parser("query", help="Hours and engagement for matching conversations")
+    query_parser.add_argument("--keyword", "-k", help="Only conversations mentioning all of these words")
+    query_parser.add_argument("--since", type=parse_date_arg, help="Start date (e.g. 2024-01-01)")
+    query_parser.add_argument("--until", type=parse_until_arg, help="End date, inclusive (e.g. 2024-12-31)")
+    query_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "index":
+        start = time.perf_counter()
+        try:
+            stream = open_exports(args.conversations_json, lenient=args.lenient)
+            conv_count, message_count = build_index(stream, args.db, unicode=args.unicode)
+        except FileNotFoundError as e:
+            print(f"❌ File not found: {e.filename}")
+            sys.exit(1)
+        except json.JSONDecodeError:
+            print(f"❌ Invalid JSON file: {', '.join(args.conversations_json)} (try --lenient to recover what's readable)")
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        if getattr(stream, "quarantined", None):
+            print(quarantine_report(stream.quarantined), file=sys.stderr)
+        print(f"✅ Indexed {conv_count:,} conversations ({message_count:,} messages) "
+              f"into {args.db} in {elapsed:.1f}s")
+        return
+
+    if not Path(args.db).exists():
+        print(f"❌ Index not found: {args.db} (run the 'index' command first)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    result = query_index(args.db, keyword=args.keyword, since=args.since, until=args.until)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    badge_emoji, _ = get_badge_tier(result["hours"])
+    tier_emoji, _ = get_engagement_tier(result["engagement_score"])
+
+    print("\n" + "="*60)
+    print("🔎 NUEVA VISTA WRAPPED - INDEX QUERY")
+    print("="*60)
+    print()
+    print(f"  • Matching conversations: {result['conversations']:,}")
+    print(f"  • Messages you wrote: {result['user_msgs']:,}")
+    print(f"  • AI replies read: {result['ai_msgs']:,}")
+    print(f"  • Hours with AI: {result['hours']:.1f} hrs ({badge_emoji})")
+    print(f"  • AI Engagement Score: {result['engagement_score']:.1f}/100 ({tier_emoji})")
+    print()
+    print(f"⏱️  Answered in {elapsed_ms:.1f} ms")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -3,34 +3,41 @@
 Nueva Vista Wrapped - Quick Hours Analysis
 Get your AI collaboration hours badge instantly
 
-Usage: python nv_quick_hours.py /path/to/conversations.json
+Usage: python nv_quick_hours.py /path/to/conversations.json [more exports to merge ...]
 """
 
 import argparse
 import json
-import re
+import math
 import sys
+from array import array
 from datetime import datetime
 from collections import Counter
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed for --sensitivity
+    np = None
+
+# Shared utilities live in scripts/ next to helpers.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from aggregates import AggregateExporter
+from chunked_reader import quarantine_report
+from helpers import BADGE_TIERS, get_badge_tier as tier_for_hours
+from merge import MergedExports, open_exports
+from share_card import cairosvg, render_card, save_card
+from streaming import ProgressReporter
+from tokenizer import tokenize
 
 # Constants
 READING_WPM_DEFAULT = 220
 WRITING_WPM_DEFAULT = 25
 READING_WPM_LOW, READING_WPM_HIGH = 260, 180
 WRITING_WPM_LOW, WRITING_WPM_HIGH = 35, 18
-
-def tokenize(text):
-    """Basic word tokenizer, strips code and URLs"""
-    if not text:
-        return []
-
-    # Strip code blocks and URLs
-    text = re.sub(r"`.*?`", " ", text, flags=re.S)
-    text = re.sub(r"https?://\S+", " ", text)
-
-    # Extract word tokens
-    tokens = re.findall(r"[A-Za-z0-9'']+", text.lower())
-    return tokens
+LENGTH_REFERENCE_WORDS = 100
+SENSITIVITY_PERCENTILES = (5, 25, 50, 75, 95)
+SENSITIVITY_SEED = 2025
 
 def extract_message_text(msg):
     """Extract text from ChatGPT message format"""
@@ -51,8 +58,32 @@ def extract_message_text(msg):
 
     return content.get("text", "")
 
-def parse_conversations(data):
-    """Parse conversations from ChatGPT export format"""
+def iter_messages(conv, unicode=False):
+    """Yield (node_id, role, text, timestamp, word_count) for each message in a conversation"""
+    for node_id, node in conv.get("mapping", {}).items():
+        msg = node.get("message")
+        if not msg:
+            continue
+
+        author = msg.get("author", {})
+        role = author.get("role", "")
+        text = extract_message_text(msg)
+        timestamp = msg.get("create_time") or conv.get("create_time")
+
+        yield node_id, role, text, timestamp, len(tokenize(text, unicode=unicode))
+
+def parse_conversations(data, keep_word_counts=False, unicode=False, aggregator=None):
+    """Parse conversations from ChatGPT export format
+
+    With keep_word_counts, per-message word counts are also returned by role
+    (as compact int arrays) so hours can be re-evaluated for any reading and
+    writing speed without re-parsing the export.  unicode selects the
+    Unicode-aware tokenizer for non-ASCII messages.  An aggregator (see
+    scripts/aggregates.py) is fed every conversation and message in the same
+    pass.
+    """
+    user_word_counts = array("I")
+    ai_word_counts = array("I")
     total_user_words = 0
     total_ai_words = 0
     total_user_msgs = 0
@@ -61,41 +92,37 @@ def parse_conversations(data):
     first_timestamp = None
     last_timestamp = None
 
-    conversations = data if isinstance(data, list) else [data]
+    conversations = [data] if isinstance(data, dict) else data
 
     for conv in conversations:
         if not isinstance(conv, dict):
             continue
 
         total_conversations += 1
-        mapping = conv.get("mapping", {})
-
-        for node_id, node in mapping.items():
-            msg = node.get("message")
-            if not msg:
-                continue
-
-            author = msg.get("author", {})
-            role = author.get("role", "")
-            text = extract_message_text(msg)
-            timestamp = msg.get("create_time") or conv.get("create_time")
+        if aggregator is not None:
+            aggregator.add_conversation(conv)
 
+        for node_id, role, text, timestamp, word_count in iter_messages(conv, unicode=unicode):
+            if aggregator is not None:
+                aggregator.add_message(role, text, timestamp, word_count)
             if timestamp:
                 if not first_timestamp or timestamp < first_timestamp:
                     first_timestamp = timestamp
                 if not last_timestamp or timestamp > last_timestamp:
                     last_timestamp = timestamp
 
-            word_count = len(tokenize(text))
-
             if role == "user":
                 total_user_words += word_count
                 total_user_msgs += 1
+                if keep_word_counts:
+                    user_word_counts.append(word_count)
             elif role == "assistant":
                 total_ai_words += word_count
                 total_ai_msgs += 1
+                if keep_word_counts:
+                    ai_word_counts.append(word_count)
 
-    return {
+    stats = {
         "total_conversations": total_conversations,
         "total_user_msgs": total_user_msgs,
         "total_ai_msgs": total_ai_msgs,
@@ -105,6 +132,12 @@ def parse_conversations(data):
         "last_timestamp": last_timestamp
     }
 
+    if keep_word_counts:
+        stats["user_word_counts"] = user_word_counts
+        stats["ai_word_counts"] = ai_word_counts
+
+    return stats
+
 def calculate_hours(user_words, ai_words, read_wpm=READING_WPM_DEFAULT, write_wpm=WRITING_WPM_DEFAULT):
     """Calculate total hours spent"""
     writing_minutes = user_words / max(1, write_wpm)
@@ -112,20 +145,81 @@ def calculate_hours(user_words, ai_words, read_wpm=READING_WPM_DEFAULT, write_wp
     total_minutes = writing_minutes + reading_minutes
     return total_minutes / 60.0
 
-def get_badge_tier(hours):
-    """Get badge tier based on hours"""
-    if hours >= 500:
-        return "🏆 AI Legend", "500+ hours"
-    elif hours >= 250:
-        return "🚀 AI Pioneer", "250+ hours"  
-    elif hours >= 100:
-        return "⭐ AI Explorer", "100+ hours"
-    elif hours >= 50:
-        return "🌱 AI Apprentice", "50+ hours"
-    elif hours >= 10:
-        return "👶 AI Curious", "10+ hours"
+def effective_words(word_counts, length_adjust=0.0):
+    """Sum per-message word counts, adjusted for message length
+
+    With length_adjust > 0, long messages are processed faster than the base
+    speed (skimming) and short ones slower: a message of n words is read or
+    written at wpm * (n / LENGTH_REFERENCE_WORDS) ** length_adjust.  Because the
+    adjustment only depends on n, it folds into a single weighted word total.
+    """
+    counts = np.asarray(word_counts, dtype=np.float64)
+    counts = counts[counts > 0]
+    if not length_adjust:
+        return float(counts.sum())
+    return float((counts * (counts / LENGTH_REFERENCE_WORDS) ** -length_adjust).sum())
+
+def calculate_hours_grid(user_word_counts, ai_word_counts, read_wpm, write_wpm, length_adjust=0.0):
+    """Vectorized calculate_hours over arrays of reading/writing speeds
+
+    read_wpm and write_wpm may be scalars or arrays of any broadcastable shape,
+    e.g. read[:, None] and write[None, :] for a full speed grid.
+    """
+    user_words = effective_words(user_word_counts, length_adjust)
+    ai_words = effective_words(ai_word_counts, length_adjust)
+    read = np.maximum(1, np.asarray(read_wpm, dtype=np.float64))
+    write = np.maximum(1, np.asarray(write_wpm, dtype=np.float64))
+    return (user_words / write + ai_words / read) / 60.0
+
+def sample_wpm(center, fast, slow, size, rng):
+    """Draw log-normal WPM samples around center, with fast/slow as the 5th-95th percentile band"""
+    sigma = math.log(max(fast, slow) / min(fast, slow)) / (2 * 1.645)
+    return center * np.exp(rng.normal(0.0, sigma, size))
+
+def grid_steps(points):
+    """Speeds per axis of the --sensitivity grid (at least 2, so the grid spans the band)"""
+    return max(2, math.isqrt(points))
+
+def sensitivity_points(mode, points):
+    """Number of speed combinations hours_distribution actually evaluates"""
+    return grid_steps(points) ** 2 if mode == "grid" else points
+
+def hours_distribution(user_word_counts, ai_word_counts, read_wpm=READING_WPM_DEFAULT,
+                       write_wpm=WRITING_WPM_DEFAULT, mode="sample", points=10000,
+                       length_adjust=0.0, percentiles=SENSITIVITY_PERCENTILES):
+    """Estimate the distribution of hours over a range of reading/writing speeds
+
+    The low/high speed bands are scaled to the (optionally calibrated) centre
+    speeds.  In "grid" mode hours are evaluated on an evenly spaced
+    sqrt(points) x sqrt(points) speed grid; in "sample" mode on `points` speeds
+    drawn from log-normal distributions with a fixed seed, so results stay
+    reproducible.
+
+    Returns:
+        Dict mapping each percentile to estimated hours
+    """
+    read_scale = read_wpm / READING_WPM_DEFAULT
+    write_scale = write_wpm / WRITING_WPM_DEFAULT
+    read_fast, read_slow = READING_WPM_LOW * read_scale, READING_WPM_HIGH * read_scale
+    write_fast, write_slow = WRITING_WPM_LOW * write_scale, WRITING_WPM_HIGH * write_scale
+
+    if mode == "grid":
+        steps = grid_steps(points)
+        read = np.linspace(read_slow, read_fast, steps)[:, None]
+        write = np.linspace(write_slow, write_fast, steps)[None, :]
     else:
-        return "🐣 AI Newcomer", "Getting started"
+        rng = np.random.default_rng(SENSITIVITY_SEED)
+        read = sample_wpm(read_wpm, read_fast, read_slow, points, rng)
+        write = sample_wpm(write_wpm, write_fast, write_slow, points, rng)
+
+    hours = calculate_hours_grid(user_word_counts, ai_word_counts, read, write, length_adjust)
+    return dict(zip(percentiles, np.percentile(hours, percentiles).tolist()))
+
+def get_badge_tier(hours):
+    """Get badge tier based on hours (shared tier table in helpers.BADGE_TIERS)"""
+    tier, emoji = tier_for_hours(hours)
+    min_hours = BADGE_TIERS[tier]["min_hours"]
+    return f"{emoji} {tier}", f"{min_hours:.0f}+ hours" if min_hours else "Getting started"
 
 def format_timestamp(ts):
     """Format timestamp to readable date"""
@@ -136,38 +230,121 @@ def format_timestamp(ts):
     except:
         return "Unknown"
 
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
+def positive_float(value):
+    """argparse type for speeds that must be greater than 0"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value}")
+    if not math.isfinite(number) or number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0: {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(
         description="Nueva Vista Wrapped - Get your AI collaboration hours"
     )
-    parser.add_argument("conversations_json", help="Path to conversations.json from ChatGPT export")
+    parser.add_argument("conversations_json", nargs="+",
+                        help="Path to conversations.json from ChatGPT export (several are merged and deduplicated)")
     parser.add_argument("--quiet", "-q", action="store_true", help="Minimal output")
+    parser.add_argument("--lenient", action="store_true",
+                        help="Skip malformed conversations in truncated or corrupt exports instead of failing")
+    parser.add_argument("--unicode", "-u", action="store_true",
+                        help="Count words in non-Latin scripts (accents, Cyrillic, CJK, ...)")
+    parser.add_argument("--read-wpm", type=positive_float, default=READING_WPM_DEFAULT,
+                        help=f"Your calibrated reading speed (default: {READING_WPM_DEFAULT})")
+    parser.add_argument("--write-wpm", type=positive_float, default=WRITING_WPM_DEFAULT,
+                        help=f"Your calibrated writing speed (default: {WRITING_WPM_DEFAULT})")
+    parser.add_argument("--export-aggregates", metavar="PATH",
+                        help="Also write anonymized aggregates (no titles or text) as NDJSON (.gz to compress)")
+    parser.add_argument("--salt", help="Salt for hashed conversation ids in --export-aggregates "
+                                       "(default: random per run, so runs can't be linked)")
+    parser.add_argument("--per-conversation", action="store_true",
+                        help="Include one record per conversation (salted id and counts) in --export-aggregates")
+    parser.add_argument("--card", metavar="PATH",
+                        help="Save a shareable summary card (.svg, or .png with cairosvg installed)")
+    parser.add_argument("--sensitivity", choices=["sample", "grid"],
+                        help="Show the distribution of hours over a range of speeds (requires numpy)")
+    parser.add_argument("--points", type=positive_int, default=10000,
+                        help="Number of speed combinations for --sensitivity (default: 10000)")
+    parser.add_argument("--length-adjust", type=float, default=0.0,
+                        help="Per-message length adjustment exponent for --sensitivity (default: 0)")
 
     args = parser.parse_args()
 
+    if args.sensitivity and np is None:
+        print("❌ --sensitivity requires numpy: pip install numpy")
+        sys.exit(1)
+    if args.card and args.card.lower().endswith(".png") and cairosvg is None:
+        print("❌ PNG cards require cairosvg: pip install cairosvg")
+        sys.exit(1)
+
     try:
-        with open(args.conversations_json, "r", encoding="utf-8", errors="ignore") as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ File not found: {args.conversations_json}")
+        stream = open_exports(args.conversations_json, lenient=args.lenient)
+        with ProgressReporter(stream) as progress:
+            if args.export_aggregates:
+                with AggregateExporter(args.export_aggregates, salt=args.salt,
+                                       per_conversation=args.per_conversation) as aggregator:
+                    stats = parse_conversations(progress.track(stream), keep_word_counts=bool(args.sensitivity),
+                                                unicode=args.unicode, aggregator=aggregator)
+            else:
+                stats = parse_conversations(progress.track(stream), keep_word_counts=bool(args.sensitivity),
+                                            unicode=args.unicode)
+    except FileNotFoundError as e:
+        print(f"❌ File not found: {e.filename}")
         sys.exit(1)
     except json.JSONDecodeError:
-        print(f"❌ Invalid JSON file: {args.conversations_json}")
+        print(f"❌ Invalid JSON file: {', '.join(args.conversations_json)} (try --lenient to recover what's readable)")
         sys.exit(1)
 
-    # Parse the data
-    stats = parse_conversations(data)
-
-    # Calculate hours
-    hours_est = calculate_hours(stats["total_user_words"], stats["total_ai_words"])
+    if progress.cancelled:
+        print(f"⚠️  Interrupted: partial results for the first {progress.summary()}", file=sys.stderr)
+    if getattr(stream, "quarantined", None):
+        print(quarantine_report(stream.quarantined), file=sys.stderr)
+    if isinstance(stream, MergedExports):
+        print(f"🔀 Merged {stream.stats['exports']} exports: skipped {stream.stats['duplicate_conversations']:,} "
+              f"duplicate conversations and {stream.stats['duplicate_messages']:,} duplicate messages",
+              file=sys.stderr)
+
+    # Calculate hours (speed ranges scale with calibrated speeds)
+    read_scale = args.read_wpm / READING_WPM_DEFAULT
+    write_scale = args.write_wpm / WRITING_WPM_DEFAULT
+    hours_est = calculate_hours(stats["total_user_words"], stats["total_ai_words"],
+                                read_wpm=args.read_wpm, write_wpm=args.write_wpm)
     hours_low = calculate_hours(stats["total_user_words"], stats["total_ai_words"], 
-                               read_wpm=READING_WPM_LOW, write_wpm=WRITING_WPM_LOW)
+                               read_wpm=READING_WPM_LOW * read_scale, write_wpm=WRITING_WPM_LOW * write_scale)
     hours_high = calculate_hours(stats["total_user_words"], stats["total_ai_words"],
-                                read_wpm=READING_WPM_HIGH, write_wpm=WRITING_WPM_HIGH)
+                                read_wpm=READING_WPM_HIGH * read_scale, write_wpm=WRITING_WPM_HIGH * write_scale)
 
     # Get badge info
     badge_emoji, badge_desc = get_badge_tier(hours_est)
 
+    if args.card:
+        card = render_card({
+            "hours": hours_est,
+            "conversations": stats["total_conversations"],
+            "messages": stats["total_user_msgs"],
+            "words": stats["total_user_words"],
+        })
+        try:
+            save_card(card, args.card)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    if args.export_aggregates:
+        print(f"🔒 Anonymized aggregates saved to: {args.export_aggregates}", file=sys.stderr)
+
     if args.quiet:
         print(f"{hours_est:.1f}")
         return
@@ -187,6 +364,16 @@ def main():
     print(f"  • Words you wrote: {stats['total_user_words']:,}")
     print(f"  • Words you read from AI: {stats['total_ai_words']:,}")
     print()
+    if args.sensitivity:
+        distribution = hours_distribution(
+            stats["user_word_counts"], stats["ai_word_counts"],
+            read_wpm=args.read_wpm, write_wpm=args.write_wpm,
+            mode=args.sensitivity, points=args.points, length_adjust=args.length_adjust
+        )
+        print(f"📈 HOURS SENSITIVITY ({args.sensitivity}, {sensitivity_points(args.sensitivity, args.points):,} speed combinations):")
+        for pct, hours in distribution.items():
+            print(f"  • p{pct}: {hours:.1f} hrs")
+        print()
     print("📅 TIMELINE:")
     print(f"  • First conversation: {format_timestamp(stats['first_timestamp'])}")
     print(f"  • Latest activity: {format_timestamp(stats['last_timestamp'])}")
@@ -196,6 +383,8 @@ def main():
     print(f"  I've spent {hours_est:.1f} hours building with AI!")
     print(f"  📊 {stats['total_conversations']:,} conversations • {stats['total_user_msgs']:,} messages • {stats['total_user_words']:,} words written")
     print(f"  #NuevaVistaWrapped")
+    if args.card:
+        print(f"  🎨 Card saved to: {args.card}")
     print()
     print("💡 NOTE: This analysis covers ChatGPT only.")
     print("   Your total AI collaboration time across all tools is likely 2-3x higher!")
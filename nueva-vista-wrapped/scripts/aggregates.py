@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Anonymized Aggregate Export
+Collect privacy-safe usage aggregates (no titles, no text, salted ids) while
+an export is parsed, for community benchmarks and team dashboards.
+"""
+
+import base64
+import hashlib
+import math
+import secrets
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from helpers import PATTERN_NAMES, analyze_message_patterns, to_epoch
+from streaming import NDJSONWriter
+
+SCHEMA_VERSION = 1
+HLL_PRECISION = 11  # 2,048 registers: ~2.3% standard error in 2.7 KB of base64
+DAY_FIELDS = ("conversations", "user_msgs", "ai_msgs", "user_words", "ai_words")
+# Author role -> (side, index of its message count, index of its word count) in DAY_FIELDS
+ROLES = {"user": ("user", 1, 3), "assistant": ("ai", 2, 4)}
+
+class SaltedHasher:
+    """
+    Keyed 64-bit hashes of identifiers.
+
+    Without a salt a random one is drawn per run and never written out, so
+    hashes can't be linked across runs. Pass the same salt (e.g. one per team)
+    to make hashes stable across runs and mergeable between people.
+    """
+
+    def __init__(self, salt: Optional[str] = None):
+        self.salted = salt is not None
+        secret = salt.encode("utf-8") if salt is not None else secrets.token_bytes(32)
+        self._key = hashlib.blake2b(secret, digest_size=32).digest()
+
+    def __call__(self, value: object) -> int:
+        digest = hashlib.blake2b(str(value).encode("utf-8", "surrogatepass"), key=self._key,
+                                 digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+class HyperLogLog:
+    """
+    Distinct-count sketch over 64-bit hashes.
+
+    Sketches built with the same salt merge by taking the register-wise max,
+    so a dashboard can count distinct conversations across many uploads
+    without ever seeing the ids.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, hashed: int) -> None:
+        """
+        Add a 64-bit hash.
+
+        Args:
+            hashed: Uniformly distributed 64-bit integer (see SaltedHasher)
+        """
+        rest_bits = 64 - self.precision
+        index = hashed >> rest_bits
+        rank = rest_bits - (hashed & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """
+        Estimate the number of distinct hashes added.
+
+        Returns:
+            Estimated distinct count
+        """
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+
+    def to_record(self) -> Dict:
+        return {"kind": "hll", "precision": self.precision,
+                "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "HyperLogLog":
+        sketch = cls(record["precision"])
+        sketch.registers = bytearray(base64.b64decode(record["registers"]))
+        return sketch
+
+def _day(timestamp) -> Optional[str]:
+    epoch = to_epoch(timestamp)
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%d")
+
+class AggregateExporter:
+    """
+    Accumulate anonymized aggregates while conversations are parsed.
+
+    Feed it from the parsing loop (parse_conversations(aggregator=...)) so
+    the export is read only once. Only counts leave this class:
+    - per-day (UTC) conversations, messages and words by role
+    - log2 histograms of words per message, by role
+    - the pattern-count vector of user messages (PATTERN_NAMES order)
+    - a HyperLogLog sketch of salted conversation ids
+    - optionally one record per conversation, keyed by its salted id
+
+    Records are written as NDJSON (gzip-compressed for .gz paths).
+
+    Usage:
+        with AggregateExporter("aggregates.ndjson.gz") as aggregator:
+            parse_conversations(conversations, aggregator=aggregator)
+    """
+
+    def __init__(self, output_file: str, salt: Optional[str] = None, per_conversation: bool = False):
+        self.output_file = output_file
+        self.per_conversation = per_conversation
+        self.hasher = SaltedHasher(salt)
+        self.sketch = HyperLogLog()
+        self.days = defaultdict(lambda: [0] * len(DAY_FIELDS))
+        self.histograms = {"user": [0] * 33, "ai": [0] * 33}
+        self.patterns = dict.fromkeys(PATTERN_NAMES, 0)
+        self.totals = dict.fromkeys(DAY_FIELDS, 0)
+        self._current = None
+        self._writer = None
+
+    def __enter__(self) -> "AggregateExporter":
+        self._writer = NDJSONWriter(self.output_file).__enter__()
+        self._writer.write({
+            "type": "meta",
+            "schema": SCHEMA_VERSION,
+            "salted": self.hasher.salted,
+            "day_fields": list(DAY_FIELDS),
+            "patterns": list(PATTERN_NAMES),
+            "histogram": "log2",
+        })
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self._flush_conversation()
+                for record in self.records():
+                    self._writer.write(record)
+        finally:
+            self._writer.__exit__(exc_type, exc, tb)
+
+    def add_conversation(self, conv: Dict) -> None:
+        """
+        Start a new conversation (its title and text are never stored).
+
+        Args:
+            conv: Conversation dictionary from the export
+        """
+        self._flush_conversation()
+        conv_id = conv.get("id") or conv.get("conversation_id") or (conv.get("title"), conv.get("create_time"))
+        hashed = self.hasher(conv_id)
+        self.sketch.add(hashed)
+
+        day = _day(conv.get("create_time"))
+        self.days[day][0] += 1
+        self.totals["conversations"] += 1
+        self._current = {"id": f"{hashed:016x}", "day": day, "user_msgs": 0, "ai_msgs": 0,
+                         "user_words": 0, "ai_words": 0}
+
+    def add_message(self, role: str, text: str, timestamp, word_count: int) -> None:
+        """
+        Count one message of the current conversation.
+
+        Args:
+            role: Author role ("user", "assistant", ...)
+            text: Message text, only used to count patterns
+            timestamp: Message timestamp (epoch or ISO)
+            word_count: Tokenized word count
+        """
+        if role not in ROLES:
+            return
+        side, msgs_index, words_index = ROLES[role]
+
+        counts = self.days[_day(timestamp)]
+        counts[msgs_index] += 1
+        counts[words_index] += word_count
+        self.totals[f"{side}_msgs"] += 1
+        self.totals[f"{side}_words"] += word_count
+        self.histograms[side][min(word_count.bit_length(), 32)] += 1
+
+        if side == "user":
+            for pattern, count in analyze_message_patterns(text).items():
+                self.patterns[pattern] += count
+
+        if self._current is not None:
+            self._current[f"{side}_msgs"] += 1
+            self._current[f"{side}_words"] += word_count
+
+    def _flush_conversation(self) -> None:
+        if self._current is not None and self.per_conversation:
+            self._writer.write({"type": "conversation", **self._current})
+        self._current = None
+
+    def records(self) -> Iterator[Dict]:
+        """
+        Aggregate records, in the order they are written after the conversations.
+
+        Returns:
+            Iterator over record dictionaries
+        """
+        yield {"type": "totals", **self.totals, "distinct_conversations": self.sketch.count()}
+        for day in sorted(self.days, key=lambda d: (d is None, d or "")):
+            yield {"type": "day", "day": day, "counts": self.days[day]}
+        for side, buckets in self.histograms.items():
+            last = max((i for i, n in enumerate(buckets) if n), default=-1)
+            yield {"type": "histogram", "role": side, "buckets": buckets[:last + 1]}
+        yield {"type": "patterns", "counts": [self.patterns[name] for name in PATTERN_NAMES]}
+        yield {"type": "sketch", "of": "conversations", **self.sketch.to_record()}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Tokenizer Benchmark
+Compare the original ASCII tokenizer with the shared tokenizer's ASCII and
+Unicode modes on English and multilingual corpora.
+
+Usage: python bench_tokenizer.py [/path/to/conversations.json]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from tokenizer import tokenize
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apps" / "cli"))
+from nv_quick_hours import extract_message_text
+from streaming import iter_conversations
+
+CORPORA = {
+    "english": "Can you help me analyze this sales dataset with pandas and find seasonal trends? "
+               "Here is `df.groupby('month')` and https://example.com/data.csv for reference.",
+    "spanish": "¿Puedes ayudarme a analizar este conjunto de datos de ventas con pandas y encontrar "
+               "tendencias estacionales? Necesito una función que calcule la pérdida.",
+    "russian": "Помоги проанализировать набор данных о продажах с помощью pandas и найти "
+               "сезонные тренды. Мне нужна функция для расчёта потерь.",
+    "japanese": "パンダスを使って売上データを分析し、季節的な傾向を見つけるのを手伝ってください。"
+                "損失を計算する関数が必要です。",
+    "chinese": "请帮我用pandas分析这个销售数据集，找出季节性趋势。我需要一个计算损失的函数。",
+}
+
+def legacy_tokenize(text):
+    """The tokenizer the CLIs used before the shared module, kept as the baseline"""
+    if not text:
+        return []
+    text = re.sub(r"`.*?`", " ", text, flags=re.S)
+    text = re.sub(r"https?://\S+", " ", text)
+    return re.findall(r"[A-Za-z0-9'']+", text.lower())
+
+def time_messages(func, messages, repeat):
+    """Best-of-`repeat` throughput in messages per second"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in messages:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return len(messages) / best
+
+def export_messages(file_path):
+    """All message texts from a ChatGPT export"""
+    messages = []
+    for conv in iter_conversations(file_path):
+        for node in conv.get("mapping", {}).values():
+            text = extract_message_text(node.get("message"))
+            if text:
+                messages.append(text)
+    return messages
+
+def main():
+    parser = argparse.ArgumentParser(description="Nueva Vista Wrapped - Tokenizer benchmark")
+    parser.add_argument("conversations_json", nargs="?", help="Optional export to benchmark as well")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages per synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    corpora = {name: [text] * args.messages for name, text in CORPORA.items()}
+    if args.conversations_json:
+        corpora["export"] = export_messages(args.conversations_json)
+
+    tokenize(CORPORA["chinese"], unicode=True)  # build the Unicode patterns outside the timings
+
+    print(f"{'corpus':<10} {'legacy msg/s':>14} {'ascii msg/s':>14} {'unicode msg/s':>14} "
+          f"{'unicode/legacy':>15} {'words legacy→unicode':>22}")
+    for name, messages in corpora.items():
+        legacy = time_messages(legacy_tokenize, messages, args.repeat)
+        ascii_mode = time_messages(tokenize, messages, args.repeat)
+        unicode_mode = time_messages(lambda t: tokenize(t, unicode=True), messages, args.repeat)
+        legacy_words = sum(len(legacy_tokenize(t)) for t in messages[:1000])
+        unicode_words = sum(len(tokenize(t, unicode=True)) for t in messages[:1000])
+        print(f"{name:<10} {legacy:>14,.0f} {ascii_mode:>14,.0f} {unicode_mode:>14,.0f} "
+              f"{unicode_mode / legacy:>14.2f}x {f'{legacy_words:,} → {unicode_words:,}':>22}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Fault-Tolerant Chunked Reader
+Split an export into byte ranges at conversation boundaries, parse the ranges
+in parallel, and quarantine malformed conversations instead of failing the
+run. Recovers everything valid from truncated or partially corrupt downloads.
+"""
+
+import json
+import mmap
+import os
+import re
+import signal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+OBJECT_START_RE = re.compile(r'\{\s*"')
+SEPARATOR_RE = re.compile(r"[\s,]*")
+SURROGATE_RE = re.compile("[\udc80-\udcff]")
+
+WINDOW_MARGIN_BYTES = 1024 * 1024
+RANGE_BYTES = 4 * 1024 * 1024
+MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+def is_conversation(obj) -> bool:
+    """True if a decoded value looks like a ChatGPT conversation."""
+    return isinstance(obj, dict) and "mapping" in obj
+
+class _RangeParser:
+    """
+    Decode consecutive top-level values from one byte range of an export.
+
+    Text is decoded lazily from the memory-mapped file, reaching past the
+    range end (doubling the margin) when the last value straddles it. Bytes
+    are decoded with surrogateescape so char and byte offsets map exactly.
+    """
+
+    def __init__(self, buf, start: int, end: int):
+        self.buf = buf
+        self.base = start
+        self.end = end
+        self.margin = WINDOW_MARGIN_BYTES
+        self._load()
+
+    def _load(self) -> None:
+        stop = min(len(self.buf), self.end + self.margin)
+        self.text = self.buf[self.base:stop].decode("utf-8", errors="surrogateescape")
+        self.complete = stop == len(self.buf)
+        self.has_surrogates = SURROGATE_RE.search(self.text) is not None
+        self._cached = (0, 0)
+
+    def _extend(self) -> bool:
+        if self.complete:
+            return False
+        self.margin *= 2
+        self._load()
+        return True
+
+    def byte_offset(self, index: int) -> int:
+        """Absolute byte offset of a char index (incremental for increasing indexes)."""
+        char_index, byte_index = self._cached if index >= self._cached[0] else (0, 0)
+        byte_index += len(self.text[char_index:index].encode("utf-8", errors="surrogateescape"))
+        self._cached = (index, byte_index)
+        return self.base + byte_index
+
+    def decode(self, index: int) -> Tuple[object, int]:
+        """
+        Decode the value starting at a char index.
+
+        Raises:
+            json.JSONDecodeError: If the value is malformed
+        """
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.text, index)
+            except json.JSONDecodeError as e:
+                # Running off the end of the window looks like truncation
+                truncated = e.pos >= len(self.text) - 1 or e.msg.startswith("Unterminated string")
+                if truncated and self._extend():
+                    continue
+                raise
+            if self.has_surrogates and SURROGATE_RE.search(self.text, index, end):
+                # Invalid UTF-8 inside: decode the bytes the same way the strict reader does
+                raw = self.buf[self.byte_offset(index):self.byte_offset(end)]
+                obj = json.loads(raw.decode("utf-8", errors="ignore"))
+            return obj, end
+
+    def sync(self, index: int) -> Optional[Tuple[int, object, int]]:
+        """
+        Find the next conversation starting at or after a char index.
+
+        Every object start is tried in turn; nested objects (messages, nodes)
+        decode but are not conversations, so the first hit is the next
+        top-level conversation.
+
+        Returns:
+            Tuple of (start, conversation, end) or None if there is none
+        """
+        while True:
+            for match in OBJECT_START_RE.finditer(self.text, index):
+                try:
+                    obj, end = self.decode(match.start())
+                except json.JSONDecodeError:
+                    continue
+                if is_conversation(obj):
+                    return match.start(), obj, end
+            index = len(self.text)
+            if not self._extend():
+                return None
+
+def iter_range(file_path: str, start: int, end: int, aligned: bool) -> Iterator[tuple]:
+    """
+    Parse the top-level values that start inside [start, end), one at a time.
+
+    An aligned range starts at a value boundary (right after the opening
+    bracket, or where the previous range's last value ended); other ranges
+    begin at the first conversation that starts inside them. A value that
+    fails to parse is quarantined up to the next conversation.
+
+    Unaligned ranges also start with a ("lead", start, end, None) entry for
+    the bytes skipped to reach their first conversation. Usually that is the
+    tail of the previous range's last value, but it may hold a malformed
+    conversation that only the caller can tell apart (see
+    LenientExport._check_lead).
+
+    Returns:
+        Iterator over ("ok", start, end, value) or ("bad", start, end, error)
+    """
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        parser = _RangeParser(buf, start, end)
+        pending = None
+
+        if aligned:
+            index = SEPARATOR_RE.match(parser.text, 0).end()
+        else:
+            pending = parser.sync(0)
+            index = pending[0] if pending else None
+            yield "lead", start, parser.byte_offset(index) if pending else len(buf), None
+
+        while index is not None and index < len(parser.text) and parser.byte_offset(index) < end:
+            if pending is not None and pending[0] == index:
+                _, obj, value_end = pending
+                pending = None
+            elif parser.text[index] == "]" and not parser.text[index + 1:].strip() and parser.complete:
+                break  # End of the top-level array
+            else:
+                try:
+                    obj, value_end = parser.decode(index)
+                except json.JSONDecodeError as e:
+                    pending = parser.sync(index + 1)
+                    bad_end = pending[0] if pending else len(parser.text)
+                    yield ("bad", parser.byte_offset(index), parser.byte_offset(bad_end),
+                           f"{e.msg} (byte {parser.byte_offset(e.pos)})")
+                    index = bad_end if pending else None
+                    continue
+
+            yield "ok", parser.byte_offset(index), parser.byte_offset(value_end), obj
+            index = SEPARATOR_RE.match(parser.text, value_end).end()
+
+def parse_range(file_path: str, start: int, end: int, aligned: bool) -> List[tuple]:
+    """
+    Parse one range in a worker process (see iter_range).
+
+    Only takes and returns picklable data.
+
+    Returns:
+        List of ("lead" | "ok" | "bad", start, end, value or error)
+    """
+    return list(iter_range(file_path, start, end, aligned))
+
+def _ignore_sigint() -> None:
+    # Ctrl-C is handled by the parent (ProgressReporter), not by each worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class LenientExport:
+    """
+    Read every valid conversation from a possibly truncated or corrupt export.
+
+    The memory-mapped file is cut into bounded byte ranges. Small files (or a
+    single worker) parse them one after another, yielding each conversation
+    as it decodes; large files parse them in worker processes, each aligning
+    its range to the next conversation boundary on its own, with at most
+    MAX_IN_FLIGHT_BYTES of the file in flight. Either way conversations are
+    yielded in file order and memory stays bounded. Malformed
+    conversations are recorded in `quarantined` with their byte offsets
+    instead of aborting the run.
+
+    Behaves like a ConversationStream (bytes_read/total_bytes), so it can be
+    passed to ProgressReporter.
+
+    Attributes:
+        quarantined: List of {"start", "end", "error"} for skipped byte ranges
+    """
+
+    def __init__(self, file_path: str, workers: Optional[int] = None):
+        self.path = Path(file_path)
+        self.total_bytes = self.path.stat().st_size
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.bytes_read = 0
+        self.quarantined = []
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.bytes_read = 0
+        self.quarantined = []
+
+        with open(self.path, "rb") as f:
+            head = f.read(WINDOW_MARGIN_BYTES).lstrip()
+        if not head:
+            return
+        if head[:1] != b"[":
+            yield from self._collect([self._parse_whole()])
+            return
+
+        start = self._array_start()
+        if self.workers > 1 and self.total_bytes >= PARALLEL_MIN_BYTES:
+            yield from self._collect(self._parallel_ranges(start))
+        else:
+            yield from self._collect(self._sequential_ranges(start))
+
+    def _array_start(self) -> int:
+        with open(self.path, "rb") as f:
+            offset = 0
+            while True:
+                byte = f.read(1)
+                offset += 1
+                if byte == b"[" or not byte:
+                    return offset
+
+    def _parse_whole(self) -> List[tuple]:
+        raw = self.path.read_bytes()
+        try:
+            return [("ok", 0, len(raw), json.loads(raw.decode("utf-8", errors="ignore")))]
+        except json.JSONDecodeError as e:
+            return [("bad", 0, len(raw), f"{e.msg} (char {e.pos})")]
+
+    def _sequential_ranges(self, start: int) -> Iterator[Iterator[tuple]]:
+        # Each range starts exactly where the previous one's last value ended,
+        # so no alignment is needed and values stream out as they decode
+        while start < self.total_bytes:
+            end = start + RANGE_BYTES
+            for entry in iter_range(str(self.path), start, end, True):
+                end = max(end, entry[2])
+                yield [entry]
+            start = end
+
+    def _parallel_ranges(self, start: int) -> Iterator[List[tuple]]:
+        # Ranges are yielded in file order; at most MAX_IN_FLIGHT_BYTES of the
+        # file is being parsed or waiting to be collected at any time
+        bounds = list(range(start, self.total_bytes, RANGE_BYTES)) + [self.total_bytes]
+        ranges = deque(zip(bounds, bounds[1:]))
+        pending = deque()
+        in_flight = 0
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint)
+        try:
+            while ranges or pending:
+                while ranges and (not pending or in_flight + ranges[0][1] - ranges[0][0] <= MAX_IN_FLIGHT_BYTES):
+                    range_start, range_end = ranges.popleft()
+                    pending.append((range_end - range_start, pool.submit(
+                        parse_range, str(self.path), range_start, range_end, range_start == start)))
+                    in_flight += range_end - range_start
+                size, future = pending.popleft()
+                in_flight -= size
+                yield future.result()
+        finally:
+            # Stopped early (e.g. Ctrl-C): drop queued ranges instead of parsing them
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _collect(self, results) -> Iterator[Dict]:
+        covered = 0
+        for range_results in results:
+            for status, start, end, value in range_results:
+                if status == "lead":
+                    # Only the part the previous range didn't already parse is unaccounted for
+                    start = max(start, covered)
+                    if start >= end:
+                        continue
+                    problem = self._check_lead(start, end)
+                    if problem is None:
+                        covered = max(covered, end)
+                        continue
+                    status = "bad"
+                    start, value = problem
+
+                covered = max(covered, end)
+                self.bytes_read = max(self.bytes_read, end)
+                if status == "ok":
+                    yield value
+                else:
+                    self.quarantined.append({"start": start, "end": end, "error": value})
+
+    def _check_lead(self, start: int, end: int) -> Optional[Tuple[int, str]]:
+        """
+        Explain the bytes a parallel range skipped before its first conversation.
+
+        Returns:
+            Tuple of (start of the malformed value, decode error), or None if
+            the span only holds separators, the closing bracket or
+            well-formed values
+        """
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        text = raw.decode("utf-8", errors="surrogateescape")
+        decoder = json.JSONDecoder()
+        # Ignore trailing separators, and the closing bracket if the span reaches the end of the file
+        stop = len(text.rstrip(" \t\r\n,]" if end == self.total_bytes else " \t\r\n,"))
+        index = SEPARATOR_RE.match(text, 0).end()
+        while index < stop:
+            # Stray non-conversation values aren't data loss: every consumer skips them
+            try:
+                _, index = decoder.raw_decode(text, index)
+            except json.JSONDecodeError as e:
+                bad_start = start + len(text[:index].encode("utf-8", errors="surrogateescape"))
+                error_at = start + len(text[:e.pos].encode("utf-8", errors="surrogateescape"))
+                return bad_start, f"{e.msg} (byte {error_at})"
+            index = SEPARATOR_RE.match(text, index).end()
+        return None
+
+def quarantine_report(quarantined: List[Dict], limit: int = 10) -> str:
+    """
+    Summarize skipped byte ranges for stderr.
+
+    Args:
+        quarantined: Entries from LenientExport.quarantined (or
+            MergedExports.quarantined, which adds "file")
+        limit: Maximum number of ranges to list
+
+    Returns:
+        Multi-line report
+    """
+    skipped = sum(entry["end"] - entry["start"] for entry in quarantined)
+    lines = [f"⚠️  Quarantined {len(quarantined):,} malformed range(s), {skipped:,} bytes skipped:"]
+    for entry in quarantined[:limit]:
+        source = f"{entry['file']} " if "file" in entry else ""
+        lines.append(f"   {source}bytes {entry['start']:,}-{entry['end']:,}: {entry['error']}")
+    if len(quarantined) > limit:
+        lines.append(f"   ... and {len(quarantined) - limit:,} more")
+    return "\n".join(lines)
@@ -6,10 +6,13 @@ Common utility functions used across the Nueva Vista Wrapped CLI tools.
 
 import re
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
 
+from chunked_reader import LenientExport, is_conversation
+from tokenizer import tokenize
+
 def clean_text(text: str) -> str:
     """
     Clean text for word counting by removing code blocks, URLs, and non-words.
@@ -40,12 +43,14 @@ def clean_text(text: str) -> str:
 
     return text
 
-def count_words(text: str) -> int:
+def count_words(text: str, unicode: bool = False) -> int:
     """
-    Count words in text using regex to match word boundaries.
+    Count words in text with the same tokenizer as the CLI tools.
 
     Args:
         text: Text to count words in
+        unicode: Count non-Latin words too (the CLIs' --unicode mode, off
+            by default like the CLIs)
 
     Returns:
         Number of words found
@@ -53,9 +58,7 @@ def count_words(text: str) -> int:
     if not text:
         return 0
 
-    cleaned = clean_text(text)
-    words = re.findall(r'\b\w+\b', cleaned)
-    return len(words)
+    return len(tokenize(text, unicode=unicode))
 
 def format_hours(hours: float) -> str:
     """
@@ -112,6 +115,36 @@ def parse_date(date_string: str) -> Optional[datetime]:
     except (ValueError, TypeError):
         return None
 
+def to_epoch(timestamp: Any) -> Optional[float]:
+    """
+    Convert an export timestamp to Unix seconds.
+
+    ChatGPT exports use epoch floats; older or hand-made files use ISO strings.
+    Naive ISO dates are treated as UTC.
+
+    Args:
+        timestamp: Epoch number or ISO formatted date string
+
+    Returns:
+        Seconds since the epoch or None if the timestamp can't be parsed
+    """
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return float(timestamp)
+    if not isinstance(timestamp, str):
+        return None
+
+    try:
+        return float(timestamp)
+    except ValueError:
+        pass
+
+    date = parse_date(timestamp)
+    if date is None:
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
 def get_date_range(conversations: List[Dict]) -> Tuple[Optional[datetime], Optional[datetime]]:
     """
     Get the date range covered by conversations.
@@ -159,12 +192,13 @@ def calculate_time_span_days(start_date: datetime, end_date: datetime) -> int:
     """
     return (end_date - start_date).days
 
-def get_vocabulary_diversity(text: str) -> int:
+def get_vocabulary_diversity(text: str, unicode: bool = False) -> int:
     """
     Calculate vocabulary diversity by counting unique words.
 
     Args:
         text: Text to analyze
+        unicode: Count non-Latin words too (the CLIs' --unicode mode)
 
     Returns:
         Number of unique words
@@ -172,9 +206,34 @@ def get_vocabulary_diversity(text: str) -> int:
     if not text:
         return 0
 
-    cleaned = clean_text(text)
-    words = re.findall(r'\b\w+\b', cleaned.lower())
-    return len(set(words))
+    return len(set(tokenize(text, unicode=unicode)))
+
+PATTERN_NAMES = ("questions", "code_requests", "creative_requests", "analysis_requests", "learning_requests")
+
+def analyze_message_patterns(text: str) -> Dict[str, int]:
+    """
+    Count request patterns (questions, code, creative, analysis, learning) in a user message.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Dictionary mapping each name in PATTERN_NAMES to its count
+    """
+    if not text:
+        return {}
+
+    text_lower = text.lower()
+
+    patterns = {
+        "questions": len(re.findall(r"\?", text)),
+        "code_requests": len(re.findall(r"\b(code|function|script|program)\b", text_lower)),
+        "creative_requests": len(re.findall(r"\b(create|write|generate|design|make)\b", text_lower)),
+        "analysis_requests": len(re.findall(r"\b(analyze|explain|compare|evaluate)\b", text_lower)),
+        "learning_requests": len(re.findall(r"\b(learn|teach|understand|how)\b", text_lower)),
+    }
+
+    return patterns
 
 def get_average_response_length(messages: List[str]) -> float:
     """
@@ -192,12 +251,15 @@ def get_average_response_length(messages: List[str]) -> float:
     total_words = sum(count_words(msg) for msg in messages)
     return total_words / len(messages)
 
-def validate_conversations_format(data: Any) -> bool:
+def validate_conversations_format(data: Any, lenient: bool = False) -> bool:
     """
     Validate that the loaded data matches expected ChatGPT export format.
 
     Args:
         data: Loaded JSON data to validate
+        lenient: Accept a list with stray non-conversation entries as long
+            as at least one element is a conversation (load_conversations
+            drops the rest) instead of judging by the first element
 
     Returns:
         True if format appears valid, False otherwise
@@ -208,6 +270,9 @@ def validate_conversations_format(data: Any) -> bool:
     if len(data) == 0:
         return True  # Empty list is valid
 
+    if lenient:
+        return any(is_conversation(item) for item in data)
+
     # Check first conversation has expected structure
     first_conv = data[0]
     if not isinstance(first_conv, dict):
@@ -219,19 +284,24 @@ def validate_conversations_format(data: Any) -> bool:
 
     return True
 
-def load_conversations(file_path: str) -> List[Dict]:
+def load_conversations(file_path: str, lenient: bool = False,
+                       quarantine: Optional[List[Dict]] = None) -> List[Dict]:
     """
     Load and validate conversations from JSON file.
 
     Args:
         file_path: Path to the conversations JSON file
+        lenient: Recover every valid conversation from a truncated or
+            partially corrupt file instead of failing
+        quarantine: Optional list that receives {"start", "end", "error"}
+            for each byte range skipped in lenient mode
 
     Returns:
         List of conversation dictionaries
 
     Raises:
         FileNotFoundError: If file doesn't exist
-        json.JSONDecodeError: If file isn't valid JSON
+        json.JSONDecodeError: If file isn't valid JSON (strict mode only)
         ValueError: If data format is invalid
     """
     path = Path(file_path)
@@ -239,11 +309,20 @@ def load_conversations(file_path: str) -> List[Dict]:
     if not path.exists():
         raise FileNotFoundError(f"Conversations file not found: {file_path}")
 
+    if lenient:
+        export = LenientExport(file_path)
+        data = list(export)
+        if quarantine is not None:
+            quarantine.extend(export.quarantined)
+        if not validate_conversations_format(data, lenient=True):
+            raise ValueError(f"No conversations found in {file_path}")
+        return [conv for conv in data if is_conversation(conv)]
+
     try:
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
     except json.JSONDecodeError as e:
-        raise json.JSONDecodeError(f"Invalid JSON in {file_path}: {e}")
+        raise json.JSONDecodeError(f"Invalid JSON in {file_path}: {e.msg}", e.doc, e.pos)
 
     if not validate_conversations_format(data):
         raise ValueError(f"Invalid conversations format in {file_path}")
@@ -362,11 +441,12 @@ NUEVA_VISTA_COLORS = {
 
 # Badge tier definitions (centralized for consistency)
 BADGE_TIERS = {
-    "AI Legend": {"min_hours": 500.0, "emoji": "🌟", "color": "volcanic_red"},
+    "AI Legend": {"min_hours": 500.0, "emoji": "🏆", "color": "volcanic_red"},
     "AI Pioneer": {"min_hours": 250.0, "emoji": "🚀", "color": "deep_ocean_blue"},
-    "AI Explorer": {"min_hours": 100.0, "emoji": "🧭", "color": "success_green"},
-    "AI Collaborator": {"min_hours": 25.0, "emoji": "🤝", "color": "warning_yellow"},
-    "AI Curious": {"min_hours": 0.0, "emoji": "🔍", "color": "neutral_gray"}
+    "AI Explorer": {"min_hours": 100.0, "emoji": "⭐", "color": "success_green"},
+    "AI Apprentice": {"min_hours": 50.0, "emoji": "🌱", "color": "warning_yellow"},
+    "AI Curious": {"min_hours": 10.0, "emoji": "👶", "color": "neutral_gray"},
+    "AI Newcomer": {"min_hours": 0.0, "emoji": "🐣", "color": "neutral_gray"}
 }
 
 def get_badge_tier(hours: float) -> Tuple[str, str]:
@@ -383,8 +463,8 @@ def get_badge_tier(hours: float) -> Tuple[str, str]:
         if hours >= tier_info["min_hours"]:
             return tier_name, tier_info["emoji"]
 
-    # Fallback (should never reach here due to 0.0 min for AI Curious)
-    return "AI Curious", "🔍"
+    # Fallback (should never reach here due to 0.0 min for AI Newcomer)
+    return "AI Newcomer", "🐣"
 
 if __name__ == "__main__":
     # Simple test when run directly
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Export Merging
+Combine several overlapping ChatGPT exports (old laptop, new account, monthly
+snapshots) into one stream of unique conversations and messages.
+"""
+
+import hashlib
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional
+
+from chunked_reader import LenientExport
+from helpers import to_epoch
+from streaming import ConversationStream
+
+def hash64(*parts: object) -> int:
+    """
+    Stable 64-bit hash of the given values.
+
+    Args:
+        parts: Values to hash (converted with str)
+
+    Returns:
+        Non-zero 64-bit integer digest
+    """
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode("utf-8", "surrogatepass"),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+class CompactHashSet:
+    """
+    Set of 64-bit hashes in a flat open-addressing table.
+
+    Each slot is 8 bytes in an array, so millions of message hashes take tens
+    of megabytes instead of the ~100 bytes per entry of a Python set of ints.
+    Membership is exact for the stored hashes; with 64-bit digests, distinct
+    messages collide with negligible probability.
+    """
+
+    MAX_LOAD = 0.6
+
+    def __init__(self, capacity: int = 1 << 16):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: int) -> bool:
+        slots, mask = self._slots, self._mask
+        i = key & mask
+        while True:
+            current = slots[i]
+            if current == key:
+                return True
+            if current == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, key: int) -> bool:
+        """
+        Add a hash to the set.
+
+        Args:
+            key: Non-zero 64-bit hash (see hash64)
+
+        Returns:
+            True if the hash was new, False if it was already present
+        """
+        slots, mask = self._slots, self._mask
+        i = key & mask
+        while True:
+            current = slots[i]
+            if current == key:
+                return False
+            if current == 0:
+                break
+            i = (i + 1) & mask
+
+        slots[i] = key
+        self._count += 1
+        if self._count > self.MAX_LOAD * len(slots):
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for key in old:
+            if key:
+                self.add(key)
+
+class MergedExports:
+    """
+    Stream the unique conversations of several exports, in two passes.
+
+    Pass one reads only conversation ids and update times to pick, for each id,
+    the copy with the newest update_time (later files win ties). Pass two
+    streams the winning copies and drops messages already emitted from another
+    export, matched by node id and timestamp or by a hash of role, timestamp
+    and text; messages without a timestamp are never matched. A conversation
+    whose timestamped messages are all duplicates is a copy and is skipped
+    entirely. Branches within one export are left alone, so merging an
+    export with itself gives the same conversations as reading it once.
+
+    Behaves like a ConversationStream (bytes_read/total_bytes cover both
+    passes), so it can be passed to ProgressReporter, which also drives
+    `poll` to redraw progress during the first pass and stop it on Ctrl-C.
+
+    Attributes:
+        poll: Optional callable checked after each first-pass conversation;
+            returning True stops the merge before anything is yielded
+        stats: Counts of inputs read and duplicates skipped
+        quarantined: Byte ranges skipped by lenient readers, with their file
+    """
+
+    def __init__(self, file_paths: List[str], reader: Callable = ConversationStream):
+        self.reader = reader
+        self.streams = [reader(path) for path in file_paths]
+        self.stats = {
+            "exports": len(file_paths),
+            "conversations_read": 0,
+            "duplicate_conversations": 0,
+            "duplicate_messages": 0,
+        }
+        self._second_pass_bytes = 0
+        self.poll = None
+
+    @property
+    def quarantined(self) -> List[Dict]:
+        return [dict(entry, file=str(stream.path))
+                for stream in self.streams for entry in getattr(stream, "quarantined", [])]
+
+    @property
+    def total_bytes(self) -> int:
+        return 2 * sum(stream.total_bytes for stream in self.streams)
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(stream.bytes_read for stream in self.streams) + self._second_pass_bytes
+
+    def __iter__(self) -> Iterator[Dict]:
+        winners = self._pick_newest()
+        if winners is None:
+            return  # Cancelled during the first pass
+        # Message hashes emitted so far, one set per export
+        seen_messages = [CompactHashSet() for _ in self.streams]
+
+        for source, first_pass in enumerate(self.streams):
+            stream = self.reader(str(first_pass.path))
+            for position, conv in enumerate(self._counted(stream)):
+                if not isinstance(conv, dict):
+                    continue
+                if winners.get(self._conversation_key(conv), (None, None, None))[1:] != (source, position):
+                    continue
+
+                conv = self._drop_duplicate_messages(conv, seen_messages, source)
+                if conv is not None:
+                    yield conv
+
+    def _counted(self, stream: ConversationStream) -> Iterator[Dict]:
+        base = self._second_pass_bytes
+        for conv in stream:
+            self._second_pass_bytes = base + stream.bytes_read
+            yield conv
+        self._second_pass_bytes = base + stream.bytes_read
+
+    @staticmethod
+    def _conversation_key(conv: Dict) -> int:
+        conv_id = conv.get("id") or conv.get("conversation_id")
+        if conv_id:
+            return hash64("id", conv_id)
+        return hash64("untitled", conv.get("title"), conv.get("create_time"))
+
+    def _pick_newest(self) -> Optional[Dict[int, tuple]]:
+        winners = {}
+        for source, stream in enumerate(self.streams):
+            for position, conv in enumerate(stream):
+                if self.poll is not None and self.poll():
+                    return None
+                if not isinstance(conv, dict):
+                    continue
+                self.stats["conversations_read"] += 1
+                key = self._conversation_key(conv)
+                updated = to_epoch(conv.get("update_time")) or to_epoch(conv.get("create_time")) or 0.0
+                current = winners.get(key)
+                if current is not None:
+                    self.stats["duplicate_conversations"] += 1
+                    if updated < current[0]:
+                        continue
+                winners[key] = (updated, source, position)
+        return winners
+
+    def _drop_duplicate_messages(self, conv: Dict, seen: List[CompactHashSet],
+                                 source: int) -> Optional[Dict]:
+        own = seen[source]
+        others = [hashes for i, hashes in enumerate(seen) if i != source and len(hashes)]
+        mapping = conv.get("mapping") or {}
+        kept = 0
+        dropped = 0
+        for node_id, node in mapping.items():
+            msg = node.get("message") if isinstance(node, dict) else None
+            if not msg:
+                continue
+
+            created = to_epoch(msg.get("create_time"))
+            if created is None:
+                # Without a timestamp, equal node ids or texts ("thanks") say
+                # nothing about being the same message; never match these
+                continue
+
+            role = msg.get("author", {}).get("role", "")
+            content = msg.get("content", {})
+            # Node ids are only unique per export, so pair them with the timestamp
+            keys = (hash64("node", msg.get("id") or node_id, created),
+                    hash64("content", role, created, content.get("parts", content.get("text"))))
+            if not any(key in hashes for hashes in others for key in keys):
+                own.add(keys[0])
+                own.add(keys[1])
+                kept += 1
+            else:
+                # Keep the node so the conversation tree stays intact
+                node["message"] = None
+                dropped += 1
+
+        self.stats["duplicate_messages"] += dropped
+        if dropped and not kept:
+            self.stats["duplicate_conversations"] += 1
+            return None
+        return conv
+
+def open_exports(file_paths: List[str], lenient: bool = False):
+    """
+    Stream one export, or the deduplicated union of several.
+
+    Args:
+        file_paths: Paths to one or more conversations JSON files
+        lenient: Skip malformed conversations instead of failing (see
+            LenientExport); skipped ranges end up in `quarantined`
+
+    Returns:
+        ConversationStream (or LenientExport) for a single file,
+        MergedExports otherwise
+
+    Raises:
+        FileNotFoundError: If any file doesn't exist
+    """
+    reader = LenientExport if lenient else ConversationStream
+    if len(file_paths) == 1:
+        return reader(file_paths[0])
+    return MergedExports(file_paths, reader=reader)
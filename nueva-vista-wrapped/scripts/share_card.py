@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Shareable Summary Cards
+Render #NuevaVistaWrapped badge cards as SVG (or PNG), one at a time or in
+batches for a whole team. Fully offline: no network, no font downloads.
+
+Usage: python share_card.py team.csv --out-dir cards/ [--png]
+"""
+
+import argparse
+import csv
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from helpers import BADGE_TIERS, NUEVA_VISTA_COLORS, get_badge_tier
+
+try:
+    import cairosvg
+except ImportError:  # Optional: only needed for PNG output
+    cairosvg = None
+
+# System font stacks only, so rendering never fetches fonts
+FONT_STACK = "system-ui, -apple-system, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif"
+EMOJI_FONT_STACK = "'Apple Color Emoji', 'Segoe UI Emoji', 'Noto Color Emoji', sans-serif"
+
+CARD_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="1200" height="630" viewBox="0 0 1200 630">
+  <defs>
+    <linearGradient id="bg" x1="0" y1="0" x2="1" y2="1">
+      <stop offset="0" stop-color="${background}"/>
+      <stop offset="1" stop-color="#0B1320"/>
+    </linearGradient>
+  </defs>
+  <rect width="1200" height="630" fill="url(#bg)"/>
+  <rect x="0" y="0" width="1200" height="12" fill="${accent}"/>
+  <text x="80" y="110" font-family="${font}" font-size="30" font-weight="700" letter-spacing="6" fill="#FFFFFF" opacity="0.8">NUEVA VISTA WRAPPED</text>
+  <text x="80" y="190" font-family="${font}" font-size="34" fill="#FFFFFF" opacity="0.9">${name}</text>
+  <text x="80" y="320" font-family="${emoji_font}" font-size="96">${emoji}</text>
+  <text x="210" y="310" font-family="${font}" font-size="72" font-weight="800" fill="${accent}">${tier}</text>
+  <text x="80" y="410" font-family="${font}" font-size="44" fill="#FFFFFF">${hours} hours building with AI</text>
+  <text x="80" y="480" font-family="${font}" font-size="30" fill="#FFFFFF" opacity="0.8">${conversations} conversations • ${messages} messages • ${words} words written</text>
+  <text x="80" y="570" font-family="${font}" font-size="28" font-weight="700" fill="${accent}">#NuevaVistaWrapped</text>
+</svg>
+"""
+
+class CardTemplate:
+    """
+    SVG template parsed once into a str.format pattern.
+
+    $name / ${name} placeholders are converted on construction, so each fill
+    is a single format_map call instead of re-scanning the template.
+    """
+
+    def __init__(self, text: str):
+        pattern = Template.pattern
+        pieces = []
+        position = 0
+        for match in pattern.finditer(text):
+            pieces.append(text[position:match.start()].replace("{", "{{").replace("}", "}}"))
+            name = match.group("named") or match.group("braced")
+            if name:
+                pieces.append("{" + name + "}")
+            elif match.group("escaped") is not None:
+                pieces.append("$")
+            else:
+                raise ValueError(f"Invalid placeholder in card template at offset {match.start()}")
+            position = match.end()
+        pieces.append(text[position:].replace("{", "{{").replace("}", "}}"))
+        self._format = "".join(pieces)
+
+    def fill(self, values: Dict[str, str]) -> str:
+        """
+        Substitute values into the template.
+
+        Args:
+            values: Placeholder name -> already-escaped string
+
+        Returns:
+            Rendered SVG text
+        """
+        return self._format.format_map(values)
+
+CARD_TEMPLATE = CardTemplate(CARD_SVG)
+
+def _number(stats: Dict, field: str, kind: type):
+    value = stats.get(field)
+    if value is None or value == "":
+        return kind(0)
+    try:
+        # Spreadsheets often export thousands separators ("1,234") and "12.0" for counts
+        number = float(value.replace(",", "") if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number: {value!r}")
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"{field} must be a non-negative number: {value!r}")
+    if kind is int and not number.is_integer():
+        raise ValueError(f"{field} must be a whole number: {value!r}")
+    return kind(number)
+
+def render_card(stats: Dict, template: CardTemplate = CARD_TEMPLATE) -> str:
+    """
+    Render a shareable summary card as SVG.
+
+    Args:
+        stats: Dict with "hours" and optionally "name", "conversations",
+            "messages" and "words"
+        template: Card template to fill
+
+    Returns:
+        SVG document as a string
+
+    Raises:
+        ValueError: If a numeric field isn't a non-negative number
+    """
+    hours = _number(stats, "hours", float)
+    conversations = _number(stats, "conversations", int)
+    messages = _number(stats, "messages", int)
+    words = _number(stats, "words", int)
+    tier, emoji = get_badge_tier(hours)
+    accent = NUEVA_VISTA_COLORS[BADGE_TIERS[tier]["color"]]
+
+    return template.fill({
+        "background": NUEVA_VISTA_COLORS["deep_ocean_blue"],
+        "accent": accent,
+        "font": FONT_STACK,
+        "emoji_font": EMOJI_FONT_STACK,
+        "name": escape(str(stats.get("name") or "")),
+        "emoji": emoji,
+        "tier": escape(tier),
+        "hours": f"{hours:,.1f}",
+        "conversations": f"{conversations:,}",
+        "messages": f"{messages:,}",
+        "words": f"{words:,}",
+    })
+
+def save_card(svg: str, output_file: str) -> None:
+    """
+    Write a rendered card, as PNG if the path ends in .png (requires cairosvg).
+
+    Args:
+        svg: Rendered SVG text
+        output_file: Destination .svg or .png path
+
+    Raises:
+        RuntimeError: If PNG output is requested without cairosvg installed
+    """
+    if output_file.lower().endswith(".png"):
+        if cairosvg is None:
+            raise RuntimeError("PNG cards require cairosvg: pip install cairosvg")
+        cairosvg.svg2png(bytestring=svg.encode("utf-8"), write_to=output_file)
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(svg)
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower() or "card"
+
+def read_team_stats(file_path: str) -> Iterator[Dict]:
+    """
+    Read team member stats from CSV, JSON (list) or NDJSON.
+
+    Args:
+        file_path: Path with columns/keys name, hours, conversations,
+            messages, words
+
+    Returns:
+        Iterator over stats dictionaries
+    """
+    path = Path(file_path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        elif path.suffix.lower() in (".ndjson", ".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def render_batch(rows: Iterable[Dict], out_dir: str, png: bool = False,
+                 skipped: Optional[List[Tuple[int, str]]] = None) -> int:
+    """
+    Render one card per team member into a directory.
+
+    Files are named after each member (numbered when names repeat). Rows
+    with invalid stats are skipped instead of aborting the batch.
+
+    Args:
+        rows: Stats dictionaries (see render_card)
+        out_dir: Output directory (created if missing)
+        png: Write PNG instead of SVG
+        skipped: Optional list that receives (row number, error) for each
+            skipped row
+
+    Returns:
+        Number of cards written
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    extension = ".png" if png else ".svg"
+    used = set()
+    written = 0
+
+    for row_number, stats in enumerate(rows, start=1):
+        try:
+            if not isinstance(stats, dict):
+                raise ValueError("not a record")
+            card = render_card(stats)
+        except ValueError as e:
+            if skipped is not None:
+                skipped.append((row_number, str(e)))
+            continue
+
+        stem = _slug(str(stats.get("name") or f"member-{row_number}"))
+        if stem in used:
+            stem = f"{stem}-{row_number}"
+        used.add(stem)
+        save_card(card, str(out / (stem + extension)))
+        written += 1
+
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Nueva Vista Wrapped - Render shareable summary cards for a team"
+    )
+    parser.add_argument("team_stats", help="CSV, JSON or NDJSON with name, hours, conversations, messages, words")
+    parser.add_argument("--out-dir", "-o", default="cards", help="Output directory (default: cards)")
+    parser.add_argument("--png", action="store_true", help="Write PNG instead of SVG (requires cairosvg)")
+
+    args = parser.parse_args()
+
+    if args.png and cairosvg is None:
+        print("❌ --png requires cairosvg: pip install cairosvg")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    skipped = []
+    try:
+        count = render_batch(read_team_stats(args.team_stats), args.out_dir, png=args.png, skipped=skipped)
+    except FileNotFoundError:
+        print(f"❌ File not found: {args.team_stats}")
+        sys.exit(1)
+    except (json.JSONDecodeError, csv.Error, UnicodeDecodeError) as e:
+        print(f"❌ Could not read {args.team_stats}: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for row_number, error in skipped:
+        print(f"⚠️  Skipped row {row_number}: {error}", file=sys.stderr)
+    if skipped and not count:
+        print(f"❌ No valid rows in {args.team_stats}")
+        sys.exit(1)
+
+    print(f"🎨 Rendered {count:,} cards into {args.out_dir}/ in {elapsed:.2f}s "
+          f"({count / max(elapsed, 1e-9):,.0f} cards/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Nueva Vista Wrapped - Streaming I/O
+Read conversations one at a time and write compact NDJSON records, so large
+exports are processed in constant memory.
+"""
+
+import codecs
+import gzip
+import io
+import json
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import ijson
+except ImportError:  # Optional: faster streaming parser for large files
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Optional: faster NDJSON serialization
+    orjson = None
+
+READ_CHUNK_BYTES = 1024 * 1024
+WRITE_BUFFER_BYTES = 1024 * 1024
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+class ConversationStream:
+    """
+    Iterate over the conversations in a ChatGPT export without loading it whole.
+
+    The export is a top-level JSON array of conversations; each one is decoded
+    as soon as it is complete. A top-level object is treated as a single
+    conversation. Uses ijson when installed, otherwise an incremental decoder
+    over buffered chunks.
+
+    Attributes:
+        bytes_read: Bytes consumed from the file so far
+        total_bytes: Size of the file in bytes
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = READ_CHUNK_BYTES):
+        self.path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.total_bytes = self.path.stat().st_size
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, "rb") as f:
+            first = self._peek_first_byte(f)
+            if first == b"{":
+                data = json.loads(self._read(f, -1).decode("utf-8", errors="ignore"))
+                yield data
+            elif ijson is not None:
+                try:
+                    yield from ijson.items(_CountingReader(f, self), "item", use_float=True)
+                except ijson.JSONError as e:
+                    # Surface the same error type as the fallback decoder
+                    raise json.JSONDecodeError(str(e).splitlines()[0], "", self.bytes_read) from e
+            else:
+                yield from self._iter_array(f)
+
+    def _read(self, f, size: int) -> bytes:
+        chunk = f.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    @staticmethod
+    def _peek_first_byte(f) -> bytes:
+        while True:
+            byte = f.read(1)
+            if not byte or not byte.isspace():
+                f.seek(f.tell() - len(byte))
+                return byte
+
+    def _iter_array(self, f) -> Iterator[Any]:
+        decoder = json.JSONDecoder()
+        # The incremental decoder keeps multi-byte characters that are split
+        # across chunk boundaries intact
+        utf8 = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        buffer = ""
+        pos = 0
+        eof = False
+        started = False
+        read_size = self.chunk_size
+
+        while True:
+            # Skip whitespace, the opening bracket and separators
+            while pos < len(buffer):
+                char = buffer[pos]
+                if char == "[" and not started:
+                    started = True
+                elif not (char.isspace() or char == ","):
+                    break
+                pos += 1
+
+            if pos < len(buffer):
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # Only an error at the end of the buffer can mean the item
+                    # is incomplete (an unterminated string reports its start);
+                    # anything earlier is corrupt, so fail without reading on
+                    truncated = e.pos >= len(buffer) - 1 or e.msg.startswith("Unterminated string")
+                    if eof or not truncated:
+                        raise
+                    # Item is incomplete: read bigger chunks until it fits
+                    read_size = min(read_size * 2, 64 * self.chunk_size)
+                else:
+                    yield item
+                    pos = end
+                    read_size = self.chunk_size
+                    continue
+            elif eof:
+                if started:
+                    raise json.JSONDecodeError("Unterminated array", buffer, pos)
+                return
+
+            chunk = self._read(f, read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+class _CountingReader:
+    """
+    File wrapper that reports bytes read back to its ConversationStream.
+
+    Invalid UTF-8 is dropped (like errors="ignore" in the fallback decoder)
+    before the bytes reach ijson, which would otherwise reject the file.
+    """
+
+    def __init__(self, f, stream: ConversationStream):
+        self._f = f
+        self._stream = stream
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            chunk = self._stream._read(self._f, size)
+            text = self._utf8.decode(chunk, final=not chunk)
+            # An empty result only means end of file when nothing was read
+            if text or not chunk:
+                return text.encode("utf-8")
+
+def iter_conversations(file_path: str) -> Iterator[Dict]:
+    """
+    Stream conversations from a ChatGPT export file.
+
+    Args:
+        file_path: Path to the conversations JSON file
+
+    Returns:
+        Iterator over conversation dictionaries
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        json.JSONDecodeError: If file isn't valid JSON
+    """
+    return iter(ConversationStream(file_path))
+
+class ProgressReporter:
+    """
+    Throughput, ETA and Ctrl-C handling for a long run over a ConversationStream.
+
+    Progress is driven by the bytes the stream has consumed and redrawn on
+    stderr at most every `interval` seconds, so the per-conversation cost is
+    one clock read. While active, the first Ctrl-C stops the stream after the
+    current conversation (so callers return results for everything processed
+    so far); a second Ctrl-C aborts as usual.
+
+    Streams that read ahead before yielding anything (MergedExports' first
+    pass) expose a `poll` attribute; while active, the reporter sets it to
+    self.poll so those passes redraw progress and stop on Ctrl-C too.
+
+    Usage:
+        with ProgressReporter(stream) as progress:
+            stats = parse_conversations(progress.track(stream))
+        if progress.cancelled:
+            ...
+    """
+
+    def __init__(self, stream: ConversationStream, out=None, interval: float = PROGRESS_INTERVAL_SECONDS,
+                 enabled: Optional[bool] = None):
+        self.stream = stream
+        self.out = out or sys.stderr
+        self.interval = interval
+        self.enabled = self.out.isatty() if enabled is None else enabled
+        self.conversations = 0
+        self.cancelled = False
+        self._started = None
+        self._last_draw = 0.0
+        self._previous_handler = None
+
+    def __enter__(self) -> "ProgressReporter":
+        self._started = time.monotonic()
+        self._previous_handler = signal.signal(signal.SIGINT, self._on_interrupt)
+        if hasattr(self.stream, "poll"):
+            self.stream.poll = self.poll
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        signal.signal(signal.SIGINT, self._previous_handler)
+        if hasattr(self.stream, "poll"):
+            self.stream.poll = None
+        if self.enabled:
+            self.out.write("\r\033[K")
+            self.out.flush()
+
+    def _on_interrupt(self, signum, frame) -> None:
+        self.cancelled = True
+        # A second Ctrl-C falls through to the default handler
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def track(self, conversations) -> Iterator[Dict]:
+        """
+        Pass conversations through, redrawing progress and stopping on Ctrl-C.
+
+        Args:
+            conversations: Iterable of conversations read from self.stream
+
+        Returns:
+            Iterator over the same conversations
+        """
+        for conv in conversations:
+            self.conversations += 1
+            yield conv
+
+            if self.poll():
+                return
+
+    def poll(self) -> bool:
+        """
+        Redraw progress if it is due and report whether Ctrl-C was pressed.
+
+        Returns:
+            True if the run should stop
+        """
+        if self.enabled and not self.cancelled:
+            now = time.monotonic()
+            if now - self._last_draw >= self.interval:
+                self._last_draw = now
+                self.draw(now)
+        return self.cancelled
+
+    def draw(self, now: Optional[float] = None) -> None:
+        """Write one status line: bytes, throughput and ETA."""
+        elapsed = max(1e-9, (now or time.monotonic()) - self._started)
+        done = self.stream.bytes_read
+        total = max(1, self.stream.total_bytes)
+        byte_rate = done / elapsed
+        remaining = (total - done) / byte_rate if byte_rate else 0
+        minutes, seconds = divmod(int(remaining), 60)
+        self.out.write(
+            f"\r\033[K⏳ {done / 1048576:,.1f}/{total / 1048576:,.1f} MB ({done / total:.0%})"
+            f" • {byte_rate / 1048576:,.1f} MB/s • {self.conversations / elapsed:,.0f} conv/s"
+            f" • ETA {minutes}:{seconds:02d}"
+        )
+        self.out.flush()
+
+    def summary(self) -> str:
+        """Describe how much of the file a cancelled run covered."""
+        total = max(1, self.stream.total_bytes)
+        return (f"{self.conversations:,} conversations "
+                f"({self.stream.bytes_read / total:.0%} of the file)")
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+class NDJSONWriter:
+    """
+    Buffered writer for newline-delimited JSON records.
+
+    Each record is serialized compactly on its own line, using orjson when it
+    is installed and the standard library otherwise. Writing to "-" streams
+    to stdout; paths ending in .gz are gzip-compressed.
+
+    Usage:
+        with NDJSONWriter("out.ndjson") as writer:
+            writer.write({"id": "abc", "words": 42})
+    """
+
+    def __init__(self, output_file: str = "-", buffer_size: int = WRITE_BUFFER_BYTES,
+                 fast: Optional[bool] = None):
+        self.output_file = output_file
+        self.buffer_size = buffer_size
+        self.fast = orjson is not None if fast is None else fast and orjson is not None
+        self.records_written = 0
+        self._file = None
+
+    def __enter__(self) -> "NDJSONWriter":
+        if self.output_file == "-":
+            self._file = sys.stdout.buffer
+        elif self.output_file.endswith(".gz"):
+            self._file = io.BufferedWriter(gzip.open(self.output_file, "wb"), self.buffer_size)
+        else:
+            self._file = open(self.output_file, "wb", buffering=self.buffer_size)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._file is sys.stdout.buffer:
+            self._file.flush()
+        else:
+            self._file.close()
+
+    def write(self, record: Dict) -> None:
+        """
+        Write one record as a single line.
+
+        Args:
+            record: JSON-serializable dictionary
+        """
+        if self.fast:
+            line = orjson.dumps(record, default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+        else:
+            line = (json.dumps(record, ensure_ascii=False, separators=(",", ":"),
+                               default=_json_default) + "\n").encode("utf-8")
+        self._file.write(line)
+        self.records_written += 1
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# The shared library and the CLIs import each other by module name
+sys.path.insert(0, str(ROOT / "apps" / "cli"))
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import chunked_reader
+from chunked_reader import LenientExport
+
+def conversation(i):
+    return {
+        "id": f"c{i}",
+        "title": f"Conversation {i}",
+        "create_time": 1700000000 + i,
+        "mapping": {
+            "1": {"id": "1", "message": {"author": {"role": "user"},
+                                         "content": {"parts": ["hello " * (i % 50 + 5)]},
+                                         "create_time": 1700000000 + i}},
+        },
+    }
+
+def build_export(count=400):
+    """Export bytes plus the byte offset where each conversation starts"""
+    pieces = []
+    offsets = []
+    position = 1
+    for i in range(count):
+        text = json.dumps(conversation(i))
+        offsets.append(position)
+        pieces.append(text)
+        position += len(text) + 2
+    return bytearray(("[" + ", ".join(pieces) + "]").encode("utf-8")), offsets
+
+def corrupt(data, offset):
+    """Break the conversation at offset without changing the file size"""
+    at = data.index(b'"mapping":', offset)
+    data[at + len(b'"mapping"')] = ord(";")
+
+def read(path, workers):
+    export = LenientExport(str(path), workers=workers)
+    ids = [conv["id"] for conv in export]
+    return ids, export.quarantined
+
+RANGE_BYTES = 16 * 1024
+
+@pytest.fixture
+def parallel(monkeypatch):
+    # Use worker processes and many small ranges even for small test files
+    monkeypatch.setattr(chunked_reader, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(chunked_reader, "RANGE_BYTES", RANGE_BYTES)
+    monkeypatch.setattr(chunked_reader, "MAX_IN_FLIGHT_BYTES", 3 * RANGE_BYTES)
+
+def test_clean_export_matches_json_load(tmp_path, parallel):
+    data, _ = build_export()
+    path = tmp_path / "conversations.json"
+    path.write_bytes(data)
+
+    expected = [conv["id"] for conv in json.loads(data)]
+    for workers in (1, 2):
+        assert read(path, workers) == (expected, [])
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_corruption_right_after_range_boundaries_is_quarantined(tmp_path, parallel, workers):
+    data, offsets = build_export()
+    bounds = range(1 + RANGE_BYTES, len(data), RANGE_BYTES)
+    broken = set()
+    for bound in bounds:
+        # The first conversation that starts inside each range
+        index = next(i for i, offset in enumerate(offsets) if offset >= bound)
+        corrupt(data, offsets[index])
+        broken.add(index)
+
+    path = tmp_path / "conversations.json"
+    path.write_bytes(data)
+
+    sequential_ids, sequential_quarantine = read(path, 1)
+    parallel_ids, parallel_quarantine = read(path, workers)
+
+    assert len(sequential_quarantine) == len(broken)
+    assert parallel_ids == sequential_ids
+    assert parallel_quarantine == sequential_quarantine
+    assert [entry["start"] for entry in parallel_quarantine] == sorted(offsets[i] for i in broken)
+
+def test_truncated_export_keeps_complete_conversations(tmp_path, parallel):
+    data, offsets = build_export()
+    path = tmp_path / "conversations.json"
+    path.write_bytes(data[:offsets[-1] + 20])
+
+    for workers in (1, 2):
+        ids, quarantined = read(path, workers)
+        assert ids == [f"c{i}" for i in range(len(offsets) - 1)]
+        assert len(quarantined) == 1
+        assert quarantined[0]["start"] == offsets[-1]
+
+def test_sequential_read_streams(tmp_path, parallel):
+    data, _ = build_export()
+    path = tmp_path / "conversations.json"
+    path.write_bytes(data)
+
+    export = LenientExport(str(path), workers=1)
+    first = next(iter(export))
+    assert first["id"] == "c0"
+    assert export.bytes_read < RANGE_BYTES
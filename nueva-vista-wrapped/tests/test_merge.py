@@ -0,0 +1,105 @@
+import json
+
+from merge import MergedExports
+from nv_quick_hours import parse_conversations
+
+def message(node_id, role, text, create_time=None):
+    return {
+        "id": node_id,
+        "message": {
+            "id": node_id,
+            "author": {"role": role},
+            "content": {"content_type": "text", "parts": [text]},
+            "create_time": create_time,
+        },
+    }
+
+def conversation(conv_id, *nodes, update_time=None):
+    return {
+        "id": conv_id,
+        "title": f"Conversation {conv_id}",
+        "create_time": 1700000000,
+        "update_time": update_time,
+        "mapping": {node["id"]: node for node in nodes},
+    }
+
+def write_export(tmp_path, name, conversations):
+    path = tmp_path / name
+    path.write_text(json.dumps(conversations), encoding="utf-8")
+    return str(path)
+
+def merge(tmp_path, *exports):
+    paths = [write_export(tmp_path, f"export{i}.json", convs) for i, convs in enumerate(exports)]
+    merged = MergedExports(paths)
+    return merged, parse_conversations(merged)
+
+def test_untimed_messages_are_not_matched_across_conversations(tmp_path):
+    exports = [
+        [conversation(conv_id, message("1", "user", "thanks"), message("2", "assistant", "you are welcome"))]
+        for conv_id in ("a", "b")
+    ]
+    merged, stats = merge(tmp_path, *exports)
+
+    assert stats["total_conversations"] == 2
+    assert stats["total_user_msgs"] == 2
+    assert merged.stats["duplicate_conversations"] == 0
+    assert merged.stats["duplicate_messages"] == 0
+
+def test_untimed_system_messages_are_not_counted_as_duplicates(tmp_path):
+    root = {"id": "root", "message": None}
+    system = message("system", "system", "")
+    convs = [
+        conversation(conv_id, root, system, message(f"{conv_id}-1", "user", f"question {conv_id}", 1700000000 + i))
+        for i, conv_id in enumerate("abc")
+    ]
+    merged, stats = merge(tmp_path, convs)
+
+    assert stats["total_conversations"] == 3
+    assert merged.stats["duplicate_messages"] == 0
+
+def test_same_conversation_in_two_exports_keeps_newest_copy(tmp_path):
+    old = conversation("a", message("1", "user", "hello", 1700000000), update_time=1700000000)
+    new = conversation("a", message("1", "user", "hello", 1700000000),
+                       message("2", "assistant", "hi there", 1700000010), update_time=1700000100)
+    merged, stats = merge(tmp_path, [new], [old])
+
+    assert stats["total_conversations"] == 1
+    assert stats["total_ai_msgs"] == 1
+    assert merged.stats["duplicate_conversations"] == 1
+
+def test_timed_messages_copied_into_another_conversation_are_dropped(tmp_path):
+    original = conversation("a", message("1", "user", "hello", 1700000000),
+                            message("2", "assistant", "hi there", 1700000010))
+    branch = conversation("b", message("1", "user", "hello", 1700000000),
+                          message("2", "assistant", "hi there", 1700000010),
+                          message("3", "user", "follow-up", 1700000020))
+    merged, stats = merge(tmp_path, [original], [branch])
+
+    assert stats["total_conversations"] == 2
+    assert stats["total_user_msgs"] == 2
+    assert merged.stats["duplicate_messages"] == 2
+
+def test_full_copy_under_another_id_is_skipped(tmp_path):
+    nodes = (message("1", "user", "hello", 1700000000), message("2", "assistant", "hi there", 1700000010))
+    merged, stats = merge(tmp_path, [conversation("a", *nodes)], [conversation("b", *json.loads(json.dumps(nodes)))])
+
+    assert stats["total_conversations"] == 1
+    assert merged.stats["duplicate_conversations"] == 1
+
+def test_merging_an_export_with_itself_changes_nothing(tmp_path):
+    original = conversation("a", message("1", "user", "hello", 1700000000),
+                            message("2", "assistant", "hi there", 1700000010))
+    # A branch edited from "a" repeats its first messages under a new id
+    branch = conversation("b", message("1", "user", "hello", 1700000000),
+                          message("2", "assistant", "hi there", 1700000010),
+                          message("3", "user", "follow-up", 1700000020))
+    other = conversation("c", message("1", "user", "question", 1700000100),
+                         message("2", "assistant", "answer", 1700000200))
+    export = [original, branch, other]
+
+    single = parse_conversations(MergedExports([write_export(tmp_path, "x.json", export)]))
+    merged, stats = merge(tmp_path, export, export)
+
+    assert stats == single
+    assert merged.stats["duplicate_conversations"] == 3
+    assert merged.stats["duplicate_messages"] == 0